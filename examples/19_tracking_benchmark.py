@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+"""
+Example 19: Speed versus accuracy of the PHD filter
+"""
+
+from signal_processing.tracking_benchmark import benchmark, pareto_frontier
+
+SETTINGS = [
+    {'num_particles': 250},
+    {'num_particles': 500},
+    {'num_particles': 1000, 'gate': 5},
+    {'num_particles': 2000, 'gate': 5},
+]
+
+def main():
+    results = benchmark(SETTINGS, n_steps=60, n_runs=3)
+    print(f"{'scenario':<10}{'settings':<40}{'OSPA':>7}{'p50 ms':>9}{'p99 ms':>9}{'scans/s':>9}")
+    for r in results:
+        print(f"{r.scenario:<10}{str(r.settings):<40}{r.ospa:>7.2f}"
+              f"{r.latency[50] * 1e3:>9.3f}{r.latency[99] * 1e3:>9.3f}{r.scans_per_second:>9.0f}")
+    print("\nFrontier on the crossing scenario:")
+    for r in pareto_frontier([r for r in results if r.scenario == 'crossing']):
+        print(f"  {r.settings}: OSPA {r.ospa:.2f}, p50 {r.latency[50] * 1e3:.3f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -6,19 +6,15 @@ Example 4: Filtering Simulated EEG Bands
 import numpy as np
 import matplotlib.pyplot as plt
 from signal_processing.eeg import simulate_eeg
-from signal_processing.filters import bandpass_filter
+from signal_processing.filters import decompose_bands
 
 def main():
     fs = 250
     duration = 10
     t, eeg = simulate_eeg(fs, duration)
 
-    # Filter the EEG into different bands
-    delta_band = bandpass_filter(eeg, 0.5, 4, fs)
-    theta_band = bandpass_filter(eeg, 4, 8, fs)
-    alpha_band = bandpass_filter(eeg, 8, 13, fs)
-    beta_band  = bandpass_filter(eeg, 13, 30, fs)
-    gamma_band = bandpass_filter(eeg, 30, 100, fs)
+    # Filter the EEG into all bands in one call
+    delta_band, theta_band, alpha_band, beta_band, gamma_band = decompose_bands(eeg, fs)
 
     plt.figure(figsize=(12, 10))
     plt.subplot(6, 1, 1)
@@ -5,15 +5,15 @@ Example 8: Wavelet Transform Example
 
 import numpy as np
 import matplotlib.pyplot as plt
-import pywt
 from signal_processing.eeg import simulate_eeg
+from signal_processing.utils import compute_wavelet_transform
 
 def main():
     fs = 250
     duration = 10
     t, eeg = simulate_eeg(fs, duration)
     scales = np.arange(1, 128)
-    coefficients, frequencies = pywt.cwt(eeg, scales, 'cmor', sampling_period=1/fs)
+    coefficients, frequencies = compute_wavelet_transform(eeg, scales, 'cmor', sampling_period=1/fs)
     
     plt.figure(figsize=(12, 6))
     plt.imshow(np.abs(coefficients), extent=[0, duration, frequencies[-1], frequencies[0]], 
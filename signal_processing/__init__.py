@@ -1,7 +1,17 @@
 # signal_processing/__init__.py
 from .config import *
-from .eeg import simulate_eeg, band_power, highpass_filter
-from .filters import bandpass_filter, iir_filter, fir_filter
-from .feature_extraction import envelope_correlation, spectral_entropy
-from .phd_filter import simulate_measurements, phd_filter
-from .utils import compute_wavelet_transform
+from .eeg import simulate_eeg, band_power, band_powers, highpass_filter
+from .design import design_cache_info, clear_design_cache, set_design_cache_size
+from .filters import (bandpass_filter, iir_filter, fir_filter, FilterBank, decompose_bands,
+                      multirate_bandpass)
+from .spectral import OnlineWelch, band_power_timeseries
+from .synthetic_eeg import SyntheticEeg, EegStream, generate_eeg_file
+from .streaming import StreamingBandpass, StreamingHighpass, StreamingFIR
+from .feature_extraction import (envelope_correlation, envelope_correlation_matrix,
+                                 amplitude_envelope_correlation, spectral_entropy)
+from .phd_filter import (simulate_measurements, simulate_measurement_sequence, phd_filter,
+                         PhdFilter, extract_targets)
+from .gm_phd import GmPhdFilter
+from .tracking_benchmark import ospa_distance, benchmark
+from .phd_ensemble import BatchPhdFilter, pack_measurements, run_monte_carlo
+from .utils import compute_wavelet_transform, wavelet_scalogram, band_scalogram
@@ -0,0 +1,182 @@
+# signal_processing/design.py
+
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+from scipy.signal import butter, firwin
+
+# Maximum number of filter designs kept in the shared cache
+DESIGN_CACHE_SIZE = 256
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+class DesignCache:
+    """
+    Bounded least-recently-used cache for filter coefficients.
+
+    Cached arrays are marked read-only so that callers cannot corrupt a design
+    shared with other callers. maxbytes optionally bounds the total array
+    size as well as the number of entries; larger values are returned
+    without being cached.
+    """
+
+    def __init__(self, maxsize=DESIGN_CACHE_SIZE, maxbytes=None):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._maxsize = int(maxsize)
+        self._maxbytes = maxbytes
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, factory):
+        """
+        Return the cached value for key, computing it with factory() on a miss.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+        value = _freeze(factory())
+        size = _nbytes(value)
+        with self._lock:
+            if self._maxsize > 0 and (self._maxbytes is None or size <= self._maxbytes):
+                if key in self._data:
+                    self._nbytes -= _nbytes(self._data[key])
+                self._data[key] = value
+                self._data.move_to_end(key)
+                self._nbytes += size
+                self._evict()
+        return value
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize, len(self._data))
+
+    @property
+    def nbytes(self):
+        """
+        Total size in bytes of the cached arrays.
+        """
+        with self._lock:
+            return self._nbytes
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def resize(self, maxsize):
+        with self._lock:
+            self._maxsize = int(maxsize)
+            self._evict()
+
+    def _evict(self):
+        while self._data and (len(self._data) > self._maxsize or
+                              (self._maxbytes is not None and self._nbytes > self._maxbytes)):
+            _, value = self._data.popitem(last=False)
+            self._nbytes -= _nbytes(value)
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, tuple):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, tuple):
+        for item in value:
+            _freeze(item)
+    return value
+
+_cache = DesignCache()
+
+def _key_cutoff(cutoff):
+    return tuple(float(c) for c in np.atleast_1d(cutoff))
+
+def butter_design(order, cutoff, btype='band', output='ba'):
+    """
+    Design a Butterworth filter, reusing a cached design when available.
+
+    Parameters:
+        order (int): Filter order.
+        cutoff (float or sequence): Cutoff(s) normalized to the Nyquist frequency.
+        btype (str): Filter type passed to scipy.signal.butter.
+        output (str): 'ba' or 'sos'.
+
+    Returns:
+        Read-only coefficients: (b, a) for 'ba', an sos array for 'sos'.
+    """
+    key = ('butter', int(order), _key_cutoff(cutoff), btype, output)
+    return _cache.get(key, lambda: butter(order, cutoff, btype=btype, output=output))
+
+def butter_sos(order, cutoff, btype='band'):
+    """
+    Butterworth second-order sections ready for scipy.signal.sosfilt.
+
+    sosfilt rejects read-only sections, so this returns a writable copy of
+    the cached design.
+
+    Parameters:
+        order (int): Filter order.
+        cutoff (float or sequence): Cutoff(s) normalized to the Nyquist frequency.
+        btype (str): Filter type passed to scipy.signal.butter.
+
+    Returns:
+        np.ndarray: (n_sections, 6) sos array.
+    """
+    return np.array(butter_design(order, cutoff, btype=btype, output='sos'))
+
+def firwin_design(numtaps, cutoff, pass_zero=False):
+    """
+    Design a windowed FIR filter, reusing a cached design when available.
+
+    Parameters:
+        numtaps (int): Number of filter taps.
+        cutoff (float or sequence): Cutoff(s) normalized to the Nyquist frequency.
+        pass_zero (bool or str): Passed to scipy.signal.firwin.
+
+    Returns:
+        np.ndarray: Read-only filter taps.
+    """
+    key = ('firwin', int(numtaps), _key_cutoff(cutoff), pass_zero)
+    return _cache.get(key, lambda: firwin(numtaps, cutoff, pass_zero=pass_zero))
+
+def cached_design(key, factory):
+    """
+    Look up any derived design quantity (e.g. a filter's frequency response) in
+    the shared cache, computing it with factory() on a miss.
+    """
+    return _cache.get(key, factory)
+
+def design_cache_info():
+    """
+    Return hit/miss statistics of the shared design cache.
+
+    Returns:
+        CacheInfo: (hits, misses, maxsize, currsize)
+    """
+    return _cache.info()
+
+def clear_design_cache():
+    """
+    Drop all cached designs and reset the statistics.
+    """
+    _cache.clear()
+
+def set_design_cache_size(maxsize):
+    """
+    Change the number of designs kept in the shared cache (0 disables caching).
+    """
+    _cache.resize(maxsize)
@@ -1,7 +1,10 @@
 # signal_processing/eeg.py
 
 import numpy as np
-from scipy.signal import butter, lfilter, welch
+from scipy.signal import welch
+
+from .config import BANDS
+from .filters import _apply_iir, _band_edges, _butter
 
 def simulate_eeg(fs, duration):
     """
@@ -42,20 +45,51 @@ def band_power(eeg, fs, band):
     freqs, psd = welch(eeg, fs, nperseg=fs*2)
     return np.sum(psd[(freqs >= fmin) & (freqs <= fmax)])
 
-def highpass_filter(data, cutoff, fs, order=4):
+def _band_masks(freqs, bands):
+    """
+    Build a (n_bands, n_freqs) matrix of frequency-bin masks, one row per band.
+    """
+    edges = _band_edges(bands)
+    return ((freqs >= edges[:, :1]) & (freqs <= edges[:, 1:])).astype(float)
+
+def band_powers(eeg, fs, bands=BANDS, axis=-1):
+    """
+    Calculate the power in several frequency bands with a single Welch PSD.
+    
+    The PSD is computed once along the time axis for every channel and reduced
+    to all bands at once, so the result matches calling band_power per band
+    and per channel.
+    
+    Parameters:
+        eeg (np.ndarray): EEG signal, e.g. (channels, samples).
+        fs (int): Sampling frequency.
+        bands (dict or sequence): Mapping of band name to (fmin, fmax), or a
+            sequence of (fmin, fmax) pairs.
+        axis (int): Time axis of eeg.
+    
+    Returns:
+        np.ndarray: Band powers with the time axis replaced by a trailing band
+        axis, e.g. (channels, n_bands).
+    """
+    freqs, psd = welch(eeg, fs, nperseg=fs*2, axis=axis)
+    psd = np.moveaxis(psd, axis, -1)
+    return psd @ _band_masks(freqs, bands).T
+
+def highpass_filter(data, cutoff, fs, order=4, output='ba', axis=-1):
     """
     Apply a high-pass Butterworth filter to remove drift.
     
     Parameters:
-        data (np.ndarray): Input signal.
+        data (np.ndarray): Input signal, e.g. (samples,) or (channels, samples).
         cutoff (float): Cutoff frequency in Hz.
         fs (int): Sampling frequency.
         order (int): Filter order.
+        output (str): 'ba' or 'sos' (second-order sections).
+        axis (int): Time axis of data.
     
     Returns:
         np.ndarray: Filtered signal.
     """
     nyquist = 0.5 * fs
     normal_cutoff = cutoff / nyquist
-    b, a = butter(order, normal_cutoff, btype='high')
-    return lfilter(b, a, data)
+    return _apply_iir(_butter(order, normal_cutoff, 'high', output), data, output, axis)
@@ -1,6 +1,7 @@
 # signal_processing/feature_extraction.py
 
 import numpy as np
+from scipy.fft import next_fast_len
 from scipy.signal import hilbert, welch
 from scipy.stats import entropy
 
@@ -18,6 +19,68 @@ def envelope_correlation(eeg_signal, audio_envelope):
     eeg_envelope = np.abs(hilbert(eeg_signal))
     return np.corrcoef(audio_envelope, eeg_envelope)[0, 1]
 
+def amplitude_envelopes(data, axis=-1):
+    """
+    Hilbert amplitude envelopes of all signals along an axis in one FFT pass.
+    
+    The signals are zero-padded to a fast FFT length, so prime lengths are not
+    slow; this changes the envelopes only slightly near the ends.
+    
+    Parameters:
+        data (np.ndarray): Signals, e.g. (channels, samples).
+        axis (int): Time axis.
+    
+    Returns:
+        np.ndarray: Envelopes with the shape of data.
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.shape[axis]
+    analytic = hilbert(data, N=next_fast_len(n), axis=axis)
+    return np.abs(np.moveaxis(np.moveaxis(analytic, axis, -1)[..., :n], -1, axis))
+
+def _standardized(data, axis):
+    # Rows of zero mean and unit norm along the time axis (last), so that
+    # dot products are Pearson correlations
+    rows = np.moveaxis(np.asarray(data, dtype=float), axis, -1)
+    rows = rows.reshape(-1, rows.shape[-1])
+    rows = rows - rows.mean(axis=-1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return rows / np.linalg.norm(rows, axis=-1, keepdims=True)
+
+def envelope_correlation_matrix(eeg, envelopes, axis=-1):
+    """
+    Correlation of every EEG channel's envelope with every stimulus envelope.
+    
+    Parameters:
+        eeg (np.ndarray): EEG signals, e.g. (channels, samples).
+        envelopes (np.ndarray): Stimulus envelopes, (n_envelopes, samples) or (samples,),
+            with time on the same axis as eeg.
+        axis (int): Time axis.
+    
+    Returns:
+        np.ndarray: Correlations of shape (channels, n_envelopes), or the
+        non-time axes of eeg followed by n_envelopes.
+    """
+    envelopes = np.asarray(envelopes, dtype=float)
+    stimulus = _standardized(envelopes, -1 if envelopes.ndim == 1 else axis)
+    eeg_envelopes = amplitude_envelopes(eeg, axis=axis)
+    lead = np.delete(eeg_envelopes.shape, axis)
+    return (_standardized(eeg_envelopes, axis) @ stimulus.T).reshape(tuple(lead) + (-1,))
+
+def amplitude_envelope_correlation(eeg, axis=-1):
+    """
+    Amplitude envelope correlation (AEC) between all pairs of EEG channels.
+    
+    Parameters:
+        eeg (np.ndarray): EEG signals, e.g. (channels, samples).
+        axis (int): Time axis.
+    
+    Returns:
+        np.ndarray: Symmetric (channels, channels) correlation matrix.
+    """
+    rows = _standardized(amplitude_envelopes(eeg, axis=axis), axis)
+    return rows @ rows.T
+
 def spectral_entropy(eeg, fs):
     """
     Calculate the spectral entropy of an EEG signal.
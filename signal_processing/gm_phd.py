@@ -0,0 +1,183 @@
+# signal_processing/gm_phd.py
+
+import numpy as np
+
+from .phd_filter import (BIRTH_RATE, CLUTTER_RATE, DETECTION_PROB, MEASUREMENT_STD,
+                         STATE_SPACE, SURVIVAL_PROB)
+
+# Components below this weight are dropped after each update
+PRUNE_THRESHOLD = 1e-5
+# Squared Mahalanobis distance under which components are merged
+MERGE_THRESHOLD = 4.0
+MAX_COMPONENTS = 100
+
+def _matrix(value, size=None):
+    value = np.atleast_2d(np.asarray(value, dtype=float))
+    if size is not None and value.shape == (1, 1) and size > 1:
+        value = value[0, 0] * np.eye(size)
+    return value
+
+class GmPhdFilter:
+    """
+    Gaussian-mixture PHD filter for linear-Gaussian models.
+
+    The intensity is a mixture whose components are stored as array tables:
+    weights (J,), means (J, d) and covariances (J, d, d). Predict and update
+    work on all components and measurements at once. The cost follows the
+    number of components, which stays near the number of targets, rather
+    than a fixed particle count.
+
+    Model matrices may be given as scalars for a 1-D state. The default model
+    is the random walk of phd_filter: F = 1, Q = 1, H = 1, R = MEASUREMENT_STD ** 2.
+    Births default to BIRTH_RATE expected targets per scan, spread over the
+    first range of state_space as ten broad components; custom births need
+    birth_weights, birth_means and birth_covs together.
+    """
+
+    __slots__ = ('transition', 'process_noise', 'measurement_matrix', 'measurement_noise',
+                 'survival_prob', 'detection_prob', 'clutter_intensity', 'birth_weights',
+                 'birth_means', 'birth_covs', 'prune_threshold', 'merge_threshold',
+                 'max_components', 'weights', 'means', 'covs')
+
+    def __init__(self, transition=1.0, process_noise=1.0, measurement_matrix=1.0,
+                 measurement_noise=MEASUREMENT_STD ** 2, survival_prob=SURVIVAL_PROB,
+                 detection_prob=DETECTION_PROB, clutter_rate=CLUTTER_RATE,
+                 state_space=STATE_SPACE, clutter_intensity=None, birth_weights=None,
+                 birth_means=None, birth_covs=None, prune_threshold=PRUNE_THRESHOLD,
+                 merge_threshold=MERGE_THRESHOLD, max_components=MAX_COMPONENTS):
+        self.transition = _matrix(transition)
+        d = self.transition.shape[0]
+        self.process_noise = _matrix(process_noise, d)
+        self.measurement_matrix = _matrix(measurement_matrix)
+        m = self.measurement_matrix.shape[0]
+        self.measurement_noise = _matrix(measurement_noise, m)
+        self.survival_prob = survival_prob
+        self.detection_prob = detection_prob
+        ranges = np.asarray(state_space, dtype=float).reshape(-1, 2)
+        if clutter_intensity is None:
+            # Uniform clutter over the measured ranges
+            clutter_intensity = clutter_rate / np.prod(ranges[:, 1] - ranges[:, 0])
+        self.clutter_intensity = clutter_intensity
+        given = [b is not None for b in (birth_weights, birth_means, birth_covs)]
+        if any(given) and not all(given):
+            raise ValueError("pass all of birth_weights, birth_means and birth_covs, or none")
+        if birth_means is None:
+            # Ten broad components along the first state coordinate
+            low, high = ranges[0]
+            spacing = (high - low) / 10
+            birth_means = np.zeros((10, d))
+            birth_means[:, 0] = low + spacing * (np.arange(10) + 0.5)
+            birth_covs = np.broadcast_to(np.eye(d) * spacing ** 2, (10, d, d))
+            birth_weights = np.full(10, BIRTH_RATE / 10)
+        self.birth_means = np.asarray(birth_means, dtype=float).reshape(-1, d)
+        self.birth_covs = np.asarray(birth_covs, dtype=float).reshape(-1, d, d)
+        self.birth_weights = np.asarray(birth_weights, dtype=float).ravel()
+        self.prune_threshold = prune_threshold
+        self.merge_threshold = merge_threshold
+        self.max_components = max_components
+        self.weights = np.empty(0)
+        self.means = np.empty((0, d))
+        self.covs = np.empty((0, d, d))
+
+    @property
+    def cardinality(self):
+        """
+        Expected number of targets (total mixture weight).
+        """
+        return float(self.weights.sum())
+
+    def predict(self):
+        """
+        Propagate the components through the motion model and add the births.
+        """
+        F = self.transition
+        self.weights = np.concatenate((self.weights * self.survival_prob, self.birth_weights))
+        self.means = np.concatenate((self.means @ F.T, self.birth_means))
+        self.covs = np.concatenate((F @ self.covs @ F.T + self.process_noise, self.birth_covs))
+
+    def update(self, measurements):
+        """
+        Measurement update of all components against all measurements.
+
+        Parameters:
+            measurements (array-like): (M,) or (M, m) measurements.
+        """
+        H, R = self.measurement_matrix, self.measurement_noise
+        z = np.asarray(measurements, dtype=float).reshape(-1, H.shape[0])
+        eta = self.means @ H.T                                    # (J, m)
+        PHt = self.covs @ H.T                                     # (J, d, m)
+        S = H @ PHt + R                                           # (J, m, m)
+        chol = np.linalg.cholesky(S)
+        gain = np.linalg.solve(S, np.swapaxes(PHt, 1, 2))         # (J, m, d) = K^T
+        gain = np.swapaxes(gain, 1, 2)                            # (J, d, m)
+        updated_covs = self.covs - gain @ np.swapaxes(PHt, 1, 2)
+
+        # Gaussian likelihood of every measurement under every component
+        innovation = z[None, :, :] - eta[:, None, :]              # (J, M, m)
+        white = np.linalg.solve(chol, np.swapaxes(innovation, 1, 2))  # (J, m, M)
+        log_norm = (np.log(np.diagonal(chol, axis1=1, axis2=2)).sum(axis=1)
+                    + 0.5 * H.shape[0] * np.log(2 * np.pi))
+        likelihood = np.exp(-0.5 * np.sum(white ** 2, axis=1) - log_norm[:, None])  # (J, M)
+        detected = self.detection_prob * self.weights[:, None] * likelihood
+        detected /= self.clutter_intensity + detected.sum(axis=0)
+
+        means = self.means[:, None, :] + np.einsum('jdm,jkm->jkd', gain, innovation)
+        J, M = detected.shape
+        self.weights = np.concatenate(((1 - self.detection_prob) * self.weights,
+                                       detected.T.ravel()))
+        d = self.means.shape[1]
+        self.means = np.concatenate((self.means, np.swapaxes(means, 0, 1).reshape(J * M, d)))
+        self.covs = np.concatenate((self.covs, np.tile(updated_covs, (M, 1, 1))))
+        self.prune()
+
+    def prune(self):
+        """
+        Drop light components, merge close ones and cap the component count.
+        """
+        keep = self.weights > self.prune_threshold
+        weights, means, covs = self.weights[keep], self.means[keep], self.covs[keep]
+        order = np.argsort(weights)[::-1]
+        weights, means, covs = weights[order], means[order], covs[order]
+        inverse = np.linalg.inv(covs)
+        remaining = np.ones(len(weights), dtype=bool)
+        merged_w, merged_m, merged_P = [], [], []
+        # Greedy merging around the heaviest remaining component; each pass is vectorized
+        while remaining.any() and len(merged_w) < self.max_components:
+            j = np.argmax(remaining)
+            diff = means - means[j]
+            distance = np.einsum('kd,de,ke->k', diff, inverse[j], diff)
+            group = remaining & (distance <= self.merge_threshold)
+            w = weights[group]
+            total = w.sum()
+            mean = w @ means[group] / total
+            spread = means[group] - mean
+            cov = (np.einsum('k,kde->de', w, covs[group])
+                   + np.einsum('k,kd,ke->de', w, spread, spread)) / total
+            merged_w.append(total)
+            merged_m.append(mean)
+            merged_P.append(cov)
+            remaining &= ~group
+        d = self.means.shape[1]
+        self.weights = np.array(merged_w)
+        self.means = np.array(merged_m).reshape(-1, d)
+        self.covs = np.array(merged_P).reshape(-1, d, d)
+
+    def step(self, measurements):
+        """
+        Run one predict and update cycle.
+
+        Returns:
+            tuple: (weights, means, covs) component tables.
+        """
+        self.predict()
+        self.update(measurements)
+        return self.weights, self.means, self.covs
+
+    def estimates(self, threshold=0.5):
+        """
+        Target state estimates: means of components with weight above threshold,
+        repeated round(weight) times.
+        """
+        keep = self.weights > threshold
+        counts = np.maximum(np.rint(self.weights[keep]).astype(np.intp), 1)
+        return np.repeat(self.means[keep], counts, axis=0)
@@ -0,0 +1,187 @@
+# signal_processing/phd_ensemble.py
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .phd_filter import (BIRTH_RATE, CLUTTER_RATE, DETECTION_PROB, MAX_KERNEL_ELEMENTS,
+                         MEASUREMENT_STD, NUM_PARTICLES, STATE_SPACE, SURVIVAL_PROB,
+                         clutter_density, simulate_measurement_sequence)
+
+def pack_measurements(scans):
+    """
+    Pack ragged measurement lists into a flat (values, offsets) pair.
+    
+    Parameters:
+        scans (sequence): One measurement list per scenario (or per scan).
+    
+    Returns:
+        tuple: (values, offsets) where scan i is values[offsets[i]:offsets[i + 1]].
+    """
+    counts = np.fromiter((len(scan) for scan in scans), dtype=np.intp, count=len(scans))
+    offsets = np.zeros(len(scans) + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    values = np.empty(offsets[-1])
+    for i, scan in enumerate(scans):
+        values[offsets[i]:offsets[i + 1]] = scan
+    return values, offsets
+
+class BatchPhdFilter:
+    """
+    B independent particle PHD filters advanced together.
+
+    Particles and weights are stored as (B, capacity) arrays, where capacity is
+    num_particles plus max_births; unused birth slots carry zero weight. The
+    model matches PhdFilter: mass holds each row's PHD mass (the expected
+    number of targets) and is carried into the next prediction. Resampling
+    is systematic, done for all rows at once.
+    """
+
+    __slots__ = ('batch_size', 'num_particles', 'survival_prob', 'detection_prob', 'birth_rate',
+                 'clutter_intensity', 'state_space', 'motion_std', 'measurement_std',
+                 'max_births', 'rng', 'particles', 'weights', 'mass')
+
+    def __init__(self, batch_size, num_particles=NUM_PARTICLES, survival_prob=SURVIVAL_PROB,
+                 detection_prob=DETECTION_PROB, birth_rate=BIRTH_RATE, clutter_rate=CLUTTER_RATE,
+                 state_space=STATE_SPACE, motion_std=1.0, measurement_std=MEASUREMENT_STD,
+                 max_births=None, rng=None):
+        self.batch_size = int(batch_size)
+        self.num_particles = int(num_particles)
+        self.survival_prob = survival_prob
+        self.detection_prob = detection_prob
+        self.birth_rate = birth_rate
+        self.clutter_intensity = clutter_density(clutter_rate, state_space)
+        self.state_space = state_space
+        self.motion_std = motion_std
+        self.measurement_std = measurement_std
+        if max_births is None:
+            mean = birth_rate * self.num_particles
+            max_births = int(np.ceil(mean + 6 * np.sqrt(mean))) + 1
+        self.max_births = int(max_births)
+        self.rng = np.random.default_rng(rng)
+        capacity = self.num_particles + self.max_births
+        self.particles = np.empty((self.batch_size, capacity))
+        self.weights = np.zeros((self.batch_size, capacity))
+        self.particles[:, :self.num_particles] = self.rng.uniform(
+            state_space[0], state_space[1], (self.batch_size, self.num_particles))
+        self.weights[:, :self.num_particles] = 1.0 / self.num_particles
+        self.mass = np.ones(self.batch_size)
+
+    def step(self, values, offsets):
+        """
+        Run one cycle of every filter.
+
+        Parameters:
+            values (np.ndarray): Packed measurements of all B scenarios.
+            offsets (np.ndarray): B + 1 offsets; scenario b owns
+                values[offsets[b]:offsets[b + 1]].
+
+        Returns:
+            tuple: (particles, weights) as (B, num_particles) views.
+        """
+        B, N = self.batch_size, self.num_particles
+        offsets = np.asarray(offsets)
+        if len(offsets) != B + 1:
+            raise ValueError(f"expected {B + 1} offsets, got {len(offsets)}")
+        rng = self.rng
+        particles, weights = self.particles, self.weights
+
+        # Predict step; the weights carry each row's PHD mass, as in PhdFilter
+        particles[:, :N] += rng.standard_normal((B, N)) * self.motion_std
+        weights[:, :N] *= self.survival_prob * self.mass[:, None]
+
+        # Birth step: slot N + j is alive in row b if j < births[b]
+        births = np.minimum(rng.poisson(self.birth_rate * N, B), self.max_births)
+        particles[:, N:] = rng.uniform(self.state_space[0], self.state_space[1],
+                                       (B, self.max_births))
+        alive = np.arange(self.max_births) < births[:, None]
+        weights[:, N:] = np.where(alive, 1.0 / (N + births)[:, None], 0.0)
+
+        # Update step, over all (measurement, particle-of-its-scenario) pairs
+        z = np.asarray(values, dtype=float)
+        scenario = np.repeat(np.arange(B), np.diff(offsets))
+        updated = (1.0 - self.detection_prob) * weights
+        scale = self.detection_prob / (np.sqrt(2 * np.pi) * self.measurement_std)
+        block = max(1, MAX_KERNEL_ELEMENTS // particles.shape[1])
+        for start in range(0, len(z), block):
+            rows = scenario[start:start + block]
+            kernel = (z[start:start + block, None] - particles[rows]) / self.measurement_std
+            kernel = scale * np.exp(-0.5 * kernel * kernel) * weights[rows]
+            kernel /= (self.clutter_intensity + kernel.sum(axis=1))[:, None]
+            # Measurements are grouped by scenario, so each group is one reduceat segment
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            updated[rows[starts]] += np.add.reduceat(kernel, starts, axis=0)
+        self.mass = updated.sum(axis=1)
+        updated /= self.mass[:, None]
+
+        # Systematic resampling of all rows at once on the flattened cdf
+        cdf = np.cumsum(updated, axis=1)
+        cdf *= N / cdf[:, -1:]
+        edges = np.ceil(cdf - rng.random((B, 1)))
+        np.clip(edges, 0, N, out=edges)
+        counts = np.diff(edges, axis=1, prepend=0.0).astype(np.intp)
+        indices = np.repeat(np.arange(particles.size), counts.ravel())
+        particles[:, :N] = particles.reshape(-1)[indices].reshape(B, N)
+        weights[:, :N] = 1.0 / N
+        weights[:, N:] = 0.0
+        return particles[:, :N], weights[:, :N]
+
+def _run_shard(n_scenarios, n_steps, true_positions, seed, simulation, filter_kwargs):
+    sim_seed, filter_seed = seed.spawn(2)
+    bank = BatchPhdFilter(n_scenarios, rng=np.random.default_rng(filter_seed), **filter_kwargs)
+    # All scans of the shard in one draw; scan step * n_scenarios + b is scenario b at step
+    positions = np.broadcast_to(true_positions, (n_steps, true_positions.shape[1]))
+    values, offsets = simulate_measurement_sequence(np.repeat(positions, n_scenarios, axis=0),
+                                                    rng=np.random.default_rng(sim_seed),
+                                                    **simulation)
+    mass = np.empty((n_scenarios, n_steps))
+    for step in range(n_steps):
+        scans = offsets[step * n_scenarios:(step + 1) * n_scenarios + 1]
+        bank.step(values[scans[0]:scans[-1]], scans - scans[0])
+        mass[:, step] = bank.mass
+    return bank.particles[:, :bank.num_particles].copy(), mass
+
+def run_monte_carlo(n_scenarios, n_steps, true_positions, seed=None, n_workers=1, shard_size=64,
+                    detection_prob=DETECTION_PROB, clutter_rate=CLUTTER_RATE,
+                    state_space=STATE_SPACE, **filter_kwargs):
+    """
+    Run many independent simulate-and-filter scenarios, sharded across processes.
+    
+    Scenarios are cut into shards of shard_size and shard i draws from the
+    i-th child of SeedSequence(seed), so the results depend on seed and
+    shard_size but not on the number of workers.
+    
+    Parameters:
+        n_scenarios (int): Number of independent scenarios.
+        n_steps (int): Scans per scenario.
+        true_positions (array-like): Target positions, either fixed (n_targets,)
+            or per step (n_steps, n_targets) with NaN for absent targets.
+        seed (int or np.random.SeedSequence): Root seed.
+        n_workers (int): Worker processes (1 runs in the calling process).
+        shard_size (int): Scenarios per batched filter.
+        detection_prob, clutter_rate, state_space: Measurement model of the simulation.
+        **filter_kwargs: Model parameters passed to BatchPhdFilter.
+    
+    Returns:
+        tuple: (particles, mass)
+            - particles: final particles, (n_scenarios, num_particles)
+            - mass: PHD mass (expected number of targets) per scan, (n_scenarios, n_steps)
+    """
+    true_positions = np.asarray(true_positions, dtype=float)
+    if true_positions.ndim < 2:
+        true_positions = true_positions.reshape(1, -1)
+    seed = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    sizes = [min(shard_size, n_scenarios - start) for start in range(0, n_scenarios, shard_size)]
+    simulation = dict(detection_prob=detection_prob, clutter_rate=clutter_rate,
+                      state_space=state_space)
+    filter_kwargs = dict(filter_kwargs, detection_prob=detection_prob,
+                         clutter_rate=clutter_rate, state_space=state_space)
+    jobs = [(size, n_steps, true_positions, child, simulation, filter_kwargs)
+            for size, child in zip(sizes, seed.spawn(len(sizes)))]
+    if n_workers == 1:
+        results = [_run_shard(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(n_workers) as pool:
+            results = list(pool.map(_run_shard, *zip(*jobs)))
+    return (np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]))
@@ -9,20 +9,371 @@ DETECTION_PROB = 0.9
 BIRTH_RATE = 0.1
 CLUTTER_RATE = 10
 STATE_SPACE = (0, 100)
+MEASUREMENT_STD = 1.0
+# Largest particle set phd_filter carries without resampling (see ess_threshold)
+MAX_PARTICLES = 2 * NUM_PARTICLES
+# Upper bound on the (measurements x particles) likelihood block evaluated at once
+MAX_KERNEL_ELEMENTS = 2**20
 
-def simulate_measurements(true_positions, detection_prob=DETECTION_PROB, clutter_rate=CLUTTER_RATE, state_space=STATE_SPACE):
+def simulate_measurements(true_positions, detection_prob=DETECTION_PROB, clutter_rate=CLUTTER_RATE, state_space=STATE_SPACE, rng=None):
     """
     Simulate measurements based on true positions, including missed detections and clutter.
+    
+    rng (np.random.Generator) selects the random stream (default: numpy global state).
     """
+    rng = np.random if rng is None else rng
     measurements = []
     for pos in true_positions:
-        if np.random.rand() < detection_prob:
-            measurements.append(pos + np.random.randn() * 1.0)
-    num_clutter = np.random.poisson(clutter_rate)
-    measurements.extend(np.random.uniform(state_space[0], state_space[1], num_clutter))
+        if rng.random() < detection_prob:
+            measurements.append(pos + rng.standard_normal() * 1.0)
+    num_clutter = rng.poisson(clutter_rate)
+    measurements.extend(rng.uniform(state_space[0], state_space[1], num_clutter))
     return measurements
 
-def phd_filter(particles, weights, measurements):
+def simulate_measurement_sequence(trajectories, n_steps=None, detection_prob=DETECTION_PROB,
+                                  clutter_rate=CLUTTER_RATE, state_space=STATE_SPACE,
+                                  measurement_std=MEASUREMENT_STD, rng=None):
+    """
+    Simulate the measurements of many scans at once.
+    
+    Detections, measurement noise and clutter are drawn for all scans and
+    targets in single vectorized draws, and the scans are returned packed
+    (CSR style) instead of as per-scan lists.
+    
+    Parameters:
+        trajectories (array-like): Target positions per scan, (n_steps, n_targets);
+            NaN marks a target that is absent in that scan. A 1-D array of
+            fixed positions is repeated for n_steps scans.
+        n_steps (int): Number of scans (required for fixed positions).
+        detection_prob (float): Probability of detecting a present target.
+        clutter_rate (float): Mean number of clutter returns per scan.
+        state_space (tuple): (low, high) range of the uniform clutter.
+        measurement_std (float): Standard deviation of the measurement noise.
+        rng (np.random.Generator or int): Random generator or seed.
+    
+    Returns:
+        tuple: (values, offsets); scan i is values[offsets[i]:offsets[i + 1]],
+        detections first, then clutter.
+    """
+    rng = np.random.default_rng(rng)
+    trajectories = np.asarray(trajectories, dtype=float)
+    if trajectories.ndim < 2:
+        if n_steps is None:
+            raise ValueError("n_steps is required for fixed target positions")
+        trajectories = np.broadcast_to(trajectories.reshape(1, -1), (n_steps, trajectories.size))
+    elif n_steps is None:
+        n_steps = len(trajectories)
+    elif len(trajectories) != n_steps:
+        raise ValueError(f"trajectories have {len(trajectories)} scans, expected {n_steps}")
+
+    detected = rng.random(trajectories.shape) < detection_prob
+    detected &= np.isfinite(trajectories)
+    detections = detected.sum(axis=1)
+    clutter = rng.poisson(clutter_rate, n_steps)
+    offsets = np.zeros(n_steps + 1, dtype=np.intp)
+    np.cumsum(detections + clutter, out=offsets[1:])
+    values = np.empty(offsets[-1])
+
+    # Detections occupy the start of each scan, in target order
+    rank = np.cumsum(detected, axis=1) - 1
+    noise = rng.standard_normal(int(detections.sum())) * measurement_std
+    values[(offsets[:-1, None] + rank)[detected]] = trajectories[detected] + noise
+
+    # Clutter fills the rest of each scan
+    n_clutter = int(clutter.sum())
+    clutter_before = np.cumsum(clutter) - clutter
+    slots = np.arange(n_clutter) + np.repeat(offsets[:-1] + detections - clutter_before, clutter)
+    values[slots] = rng.uniform(state_space[0], state_space[1], n_clutter)
+    return values, offsets
+
+def clutter_density(clutter_rate=CLUTTER_RATE, state_space=STATE_SPACE):
+    """
+    Intensity of uniform clutter over the state space (expected returns per unit).
+    """
+    return clutter_rate / (state_space[1] - state_space[0])
+
+def measurement_update(particles, weights, measurements, detection_prob=DETECTION_PROB,
+                       clutter_intensity=None, measurement_std=MEASUREMENT_STD, gate=None):
+    """
+    PHD measurement update of particle weights.
+    
+    Each weight becomes (1 - pD) w + sum_z pD g(z|x) w / (kappa(z) + sum_j pD g(z|x_j) w_j),
+    with a Gaussian likelihood g and clutter intensity kappa. The likelihood is
+    evaluated as one broadcast (measurements, particles) kernel, in blocks of at
+    most MAX_KERNEL_ELEMENTS values.
+    
+    With gate=n each measurement is only scored against the particles within
+    n standard deviations of it. The particles are sorted once and each gate
+    is found by binary search, so the cost follows the number of particles
+    inside gates rather than measurements x particles.
+    
+    Parameters:
+        particles (np.ndarray): Array of particle positions.
+        weights (np.ndarray): Array of particle weights.
+        measurements (array-like): Current measurements.
+        detection_prob (float): Probability of detection pD.
+        clutter_intensity (float): Clutter intensity kappa; defaults to the
+            uniform clutter density of the module constants.
+        measurement_std (float): Standard deviation of the measurement noise.
+        gate (float): Gate half-width in standard deviations (None: no gating).
+    
+    Returns:
+        np.ndarray: Updated (unnormalized) weights.
+    """
+    if clutter_intensity is None:
+        clutter_intensity = clutter_density()
+    z = np.asarray(measurements, dtype=float).reshape(-1, 1)
+    scale = detection_prob / (np.sqrt(2 * np.pi) * measurement_std)
+    return _whitened_update(np.reshape(particles, (-1, 1)) / measurement_std, z / measurement_std,
+                            weights, detection_prob, clutter_intensity, scale, gate)
+
+def _squared_distances(v, u, out=None, u_norm=None):
+    """
+    Squared distances between whitened measurements v (M, m) and whitened
+    predicted measurements u (N, m), as an (M, N) block.
+    """
+    if u.shape[1] == 1:
+        out = np.subtract.outer(v[:, 0], u[:, 0], out=out)
+        return np.square(out, out=out)
+    # |v|^2 + |u|^2 - 2 v.u: a single matrix product per block
+    out = np.matmul(v, u.T, out=out)
+    out *= -2.0
+    out += np.einsum('ij,ij->i', v, v)[:, None]
+    out += np.einsum('ij,ij->i', u, u) if u_norm is None else u_norm
+    return np.maximum(out, 0.0, out=out)
+
+def _whitened_update(u, v, weights, detection_prob, clutter_intensity, scale, gate):
+    if gate is not None:
+        return _gated_update(u, v, weights, detection_prob, clutter_intensity, scale, gate)
+    updated = (1.0 - detection_prob) * weights
+    block = max(1, MAX_KERNEL_ELEMENTS // max(1, len(u)))
+    for start in range(0, len(v), block):
+        kernel = _squared_distances(v[start:start + block], u)
+        kernel *= -0.5
+        np.exp(kernel, out=kernel)
+        kernel *= scale * weights
+        denominator = clutter_intensity + kernel.sum(axis=1)
+        updated += (1.0 / denominator) @ kernel
+    return updated
+
+def _gated_update(u, v, weights, detection_prob, clutter_intensity, scale, gate,
+                  presorted=False):
+    # Gates are windows on the first whitened coordinate; a pair outside the
+    # window is also outside the n-sigma ellipsoid. Unless the caller passes
+    # presorted particles (as PhdFilter does), each call sorts them: O(N log N).
+    if presorted:
+        order, sorted_u, sorted_weights = None, u, weights
+    else:
+        order = np.argsort(u[:, 0], kind='stable')
+        sorted_u = u[order]
+        sorted_weights = weights[order]
+    keys = np.ascontiguousarray(sorted_u[:, 0])
+    lo = np.searchsorted(keys, v[:, 0] - gate, side='left')
+    hi = np.searchsorted(keys, v[:, 0] + gate, side='right')
+    counts = hi - lo
+    updated = (1.0 - detection_prob) * sorted_weights
+    # Split the measurements into groups of at most MAX_KERNEL_ELEMENTS gated pairs
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(v):
+        base = ends[start] - counts[start]
+        stop = max(start + 1, int(np.searchsorted(ends, base + MAX_KERNEL_ELEMENTS, side='right')))
+        group_counts = counts[start:stop]
+        total = int(group_counts.sum())
+        if total:
+            measurement = np.repeat(np.arange(stop - start), group_counts)
+            offsets = np.cumsum(group_counts) - group_counts
+            index = np.arange(total) - np.repeat(offsets - lo[start:stop], group_counts)
+            diff = v[start:stop][measurement] - sorted_u[index]
+            kernel = scale * np.exp(-0.5 * np.einsum('ij,ij->i', diff, diff)) * sorted_weights[index]
+            denominator = clutter_intensity + np.bincount(measurement, kernel,
+                                                          minlength=stop - start)
+            updated += np.bincount(index, kernel / denominator[measurement],
+                                   minlength=len(u))
+        start = stop
+    if order is None:
+        return updated
+    result = np.empty_like(updated)
+    result[order] = updated
+    return result
+
+def effective_sample_size(weights):
+    """
+    Effective sample size 1 / sum(w^2) of the normalized weights.
+    """
+    # (sum w)^2 / sum(w^2) avoids normalizing into a temporary
+    return np.sum(weights) ** 2 / np.dot(weights, weights)
+
+# Grown on demand and shared: np.arange(n) for turning copy counts into indices
+_positions = np.arange(0, dtype=np.intp)
+
+def _repeat_indices(counts):
+    # Index i repeated counts[i] times
+    global _positions
+    if len(_positions) < len(counts):
+        _positions = np.arange(len(counts), dtype=np.intp)
+    return np.repeat(_positions[:len(counts)], counts)
+
+def _differences(edges, counts=None):
+    # counts[i] = edges[i] - edges[i - 1], with edges[-1] taken as 0
+    if counts is None:
+        counts = np.empty(len(edges), dtype=np.intp)
+    counts[0] = edges[0]
+    np.subtract(edges[1:], edges[:-1], out=counts[1:], casting='unsafe')
+    return counts
+
+def systematic_resample(weights, n=None, rng=None, cdf=None, counts=None):
+    """
+    Systematic resampling: one uniform offset, n evenly spaced positions.
+    
+    Copies are counted directly from the cumulative sum, so the cost is O(N)
+    and the returned indices are sorted.
+    
+    Parameters:
+        weights (np.ndarray): Particle weights (need not be normalized).
+        n (int): Number of indices to draw (default len(weights)).
+        rng (np.random.Generator): Random generator (default: numpy global state).
+        cdf (np.ndarray): Optional float work buffer of len(weights).
+        counts (np.ndarray): Optional np.intp work buffer of len(weights).
+    
+    Returns:
+        np.ndarray: Indices of the selected particles.
+    """
+    rng = np.random if rng is None else rng
+    n = len(weights) if n is None else n
+    cdf = np.cumsum(weights, out=cdf)
+    cdf *= n / cdf[-1]
+    # Particle i receives every position k + u that falls below n * cdf[i]
+    cdf -= rng.random()
+    np.ceil(cdf, out=cdf)
+    np.clip(cdf, 0, n, out=cdf)
+    return _repeat_indices(_differences(cdf, counts))
+
+def stratified_resample(weights, n=None, rng=None, cdf=None, counts=None):
+    """
+    Stratified resampling: one uniform draw inside each of n equal strata.
+    
+    Position k is k + u_k in units of the total weight / n, so the positions
+    below cdf[i] are the whole strata under it plus possibly the one it
+    falls in. Counting them per particle is O(N + n), with no search.
+    
+    Parameters and return value as systematic_resample.
+    """
+    rng = np.random if rng is None else rng
+    n = len(weights) if n is None else n
+    offsets = rng.random(n)
+    cdf = np.cumsum(weights, out=cdf)
+    cdf *= n / cdf[-1]
+    if counts is None:
+        counts = np.empty(len(weights), dtype=np.intp)
+    whole = np.floor(cdf, out=counts, casting='unsafe')
+    np.minimum(whole, n, out=whole)
+    # The draw in stratum whole[i] lies below cdf[i] if it is under the fraction
+    cdf -= whole
+    below = offsets[np.minimum(whole, n - 1)] < cdf
+    below &= whole < n
+    np.add(whole, below, out=cdf)
+    cdf[-1] = n
+    return _repeat_indices(_differences(cdf, counts))
+
+def residual_resample(weights, n=None, rng=None, cdf=None, counts=None):
+    """
+    Residual resampling: floor(n w) deterministic copies, the remainder drawn
+    systematically from the residual weights.
+    
+    Parameters and return value as systematic_resample.
+    """
+    n = len(weights) if n is None else n
+    expected = np.multiply(weights, n / np.sum(weights), out=cdf)
+    if counts is None:
+        counts = np.empty(len(weights), dtype=np.intp)
+    np.floor(expected, out=counts, casting='unsafe')
+    remainder = n - counts.sum()
+    if remainder > 0:
+        expected -= counts
+        counts += np.bincount(systematic_resample(expected, remainder, rng, cdf=expected),
+                              minlength=len(weights))
+    return _repeat_indices(counts)
+
+def multinomial_resample(weights, n=None, rng=None, cdf=None, counts=None):
+    """
+    Multinomial resampling with independent draws (the original scheme).
+    
+    Parameters and return value as systematic_resample; the work buffers
+    are not used.
+    """
+    rng = np.random if rng is None else rng
+    n = len(weights) if n is None else n
+    return rng.choice(len(weights), size=n, p=weights / np.sum(weights))
+
+RESAMPLERS = {
+    'systematic': systematic_resample,
+    'stratified': stratified_resample,
+    'residual': residual_resample,
+    'multinomial': multinomial_resample,
+}
+
+def _histogram_peaks(coords, states, weights, n_targets, bin_width):
+    """
+    Weighted means of states around the n_targets highest peaks of a
+    histogram of coords (N, m), smoothed with a 3^m box kernel.
+    
+    Only occupied cells are stored (sorted linear keys), so the cost is
+    O(3^m N log N) whatever the extent of the state space.
+    """
+    if n_targets <= 0 or len(coords) == 0:
+        return np.empty((0, states.shape[1]))
+    cells = np.floor(coords / bin_width).astype(np.int64)
+    cells -= cells.min(axis=0) - 1
+    shape = cells.max(axis=0) + 2
+    keys, inverse = np.unique(np.ravel_multi_index(cells.T, shape), return_inverse=True)
+    inverse = inverse.ravel()
+    mass = np.bincount(inverse, weights, minlength=len(keys))
+    moment = np.stack([np.bincount(inverse, weights * col, minlength=len(keys))
+                       for col in states.T], axis=1)
+
+    # Neighbour lookups by binary search in the sorted keys
+    m = coords.shape[1]
+    offsets = np.stack(np.meshgrid(*([[-1, 0, 1]] * m), indexing='ij'), -1).reshape(-1, m)
+    strides = np.cumprod(np.r_[1, shape[:0:-1]])[::-1]
+    neighbours = keys[:, None] + offsets @ strides
+    found = np.minimum(np.searchsorted(keys, neighbours), len(keys) - 1)
+    present = keys[found] == neighbours
+    smooth = np.where(present, mass[found], 0.0).sum(axis=1)
+
+    # A peak is at least as high as every neighbour (ties go to the lower key)
+    neighbour_smooth = np.where(present, smooth[found], -np.inf)
+    higher = (neighbour_smooth > smooth[:, None]) | (
+        (neighbour_smooth == smooth[:, None]) & (neighbours < keys[:, None]))
+    peaks = np.flatnonzero(~higher.any(axis=1) & (smooth > 0))
+    if len(peaks) > n_targets:
+        peaks = peaks[np.argpartition(-smooth[peaks], n_targets - 1)[:n_targets]]
+    peaks = peaks[np.argsort(-smooth[peaks])]
+    window = np.where(present[peaks, :, None], moment[found[peaks]], 0.0).sum(axis=1)
+    return window / smooth[peaks, None]
+
+def extract_targets(particles, weights, n_targets, bin_width=MEASUREMENT_STD):
+    """
+    Target estimates from the highest peaks of the weighted particle histogram.
+    
+    Parameters:
+        particles (np.ndarray): Particle states, (N,) or (N, d).
+        weights (np.ndarray): Particle weights.
+        n_targets (int): Number of estimates, e.g. round(cardinality).
+        bin_width (float or sequence): Histogram cell size per dimension.
+    
+    Returns:
+        np.ndarray: Estimates, (k,) or (k, d) with k <= n_targets, strongest first.
+    """
+    particles = np.asarray(particles, dtype=float)
+    states = particles.reshape(len(particles), -1)
+    estimates = _histogram_peaks(states, states, np.asarray(weights, dtype=float),
+                                 int(n_targets), np.asarray(bin_width, dtype=float))
+    return estimates[:, 0] if particles.ndim == 1 else estimates
+
+def phd_filter(particles, weights, measurements, measurement_std=MEASUREMENT_STD,
+               resampler='systematic', ess_threshold=None, rng=None, gate=None,
+               return_cardinality=False):
     """
     Apply one update cycle of a PHD filter.
     
@@ -30,29 +381,310 @@ def phd_filter(particles, weights, measurements):
         particles (np.ndarray): Array of particle positions.
         weights (np.ndarray): Array of particle weights.
         measurements (list): List of current measurements.
+        measurement_std (float): Standard deviation of the measurement noise.
+        resampler (str): One of RESAMPLERS ('systematic', 'stratified',
+            'residual', 'multinomial').
+        ess_threshold (float): If given, resampling is skipped while the
+            effective sample size stays at or above this fraction of the
+            current particle count; survivors and births are then kept as
+            they are, until the set would exceed MAX_PARTICLES.
+        rng (np.random.Generator): Random generator (default: numpy global state).
+        gate (float): Measurement gate half-width in standard deviations
+            (None: score every measurement against every particle).
+        return_cardinality (bool): Also return the expected number of targets,
+            the weight mass after the update and before normalization. To
+            carry the PHD mass across calls, pass in weights scaled by the
+            previous cardinality.
     
     Returns:
-        tuple: Updated (particles, weights)
+        tuple: Updated (particles, weights), plus the cardinality if requested.
     """
+    if resampler not in RESAMPLERS:
+        raise ValueError(f"resampler must be one of {sorted(RESAMPLERS)}, got {resampler!r}")
+    rng = np.random if rng is None else rng
+
     # Predict step: random walk (motion model)
-    particles += np.random.randn(len(particles)) * 1.0
+    particles += rng.standard_normal(len(particles)) * 1.0
     weights *= SURVIVAL_PROB
 
     # Birth step: add new particles
-    num_births = np.random.poisson(BIRTH_RATE * len(particles))
+    num_births = rng.poisson(BIRTH_RATE * len(particles))
     if num_births > 0:
-        birth_particles = np.random.uniform(STATE_SPACE[0], STATE_SPACE[1], num_births)
+        birth_particles = rng.uniform(STATE_SPACE[0], STATE_SPACE[1], num_births)
         particles = np.concatenate((particles, birth_particles))
         weights = np.concatenate((weights, np.full(num_births, 1.0/len(particles))))
 
     # Update step: adjust weights based on measurements
-    for measurement in measurements:
-        likelihood = np.exp(-0.5 * ((particles - measurement) ** 2))
-        weights += DETECTION_PROB * likelihood
+    weights = measurement_update(particles, weights, measurements,
+                                 measurement_std=measurement_std, gate=gate)
 
     # Normalize and resample
-    weights /= np.sum(weights)
-    indices = np.random.choice(len(particles), size=NUM_PARTICLES, p=weights)
-    particles = particles[indices]
-    weights = np.full(NUM_PARTICLES, 1.0 / NUM_PARTICLES)
+    cardinality = np.sum(weights)
+    weights /= cardinality
+    if not (ess_threshold is not None and len(particles) <= MAX_PARTICLES
+            and effective_sample_size(weights) >= ess_threshold * len(particles)):
+        indices = RESAMPLERS[resampler](weights, NUM_PARTICLES, rng)
+        particles = particles[indices]
+        weights = np.full(NUM_PARTICLES, 1.0 / NUM_PARTICLES)
+    if return_cardinality:
+        return particles, weights, cardinality
     return particles, weights
+
+class PhdFilter:
+    """
+    Particle PHD filter with fixed-capacity buffers.
+
+    The model parameters are taken in the constructor instead of the module
+    constants. Particle, weight and likelihood buffers are allocated once,
+    sized for capacity particles (num_particles plus max_births, or twice
+    num_particles plus max_births when ess_threshold is set, so that healthy
+    particle sets can grow unresampled), and step() works in place. The
+    returned particles and weights are views of internal buffers that the next
+    step overwrites, so copy them if they must be kept.
+
+    States may be multi-dimensional: particles are stored as (N, d) with the
+    linear model x' = F x + w, w ~ N(0, Q) and z = H x + v, v ~ N(0, R). The
+    Cholesky factors of Q and R are computed once. Each scan whitens the
+    predicted measurements with one matrix product and scores the
+    measurements with one more (see _squared_distances). Without explicit
+    matrices the model is the scalar random walk of phd_filter and
+    particles are returned as a 1-D array. state_space then gives one
+    (low, high) range per state dimension; births are uniform over it.
+
+    The weights returned are normalized; the PHD mass is kept separately as
+    cardinality (the expected number of targets) and carried to the next
+    scan, and extract() turns the particle cloud into target estimates.
+
+    The resamplers work in the filter's cdf and count buffers, so the only
+    per-step temporaries of size N are the resampler's index array (plus
+    the per-stratum draws of stratified resampling, or the residual draws of
+    residual resampling) and, with gating, the sort order and the index
+    arrays of the gated pairs. With gating the buffers are kept sorted on
+    the first whitened coordinate; resampling preserves that order, so each
+    scan sorts keys that only the motion and the births have disturbed.
+    """
+
+    __slots__ = ('cardinality', 'num_particles', 'survival_prob', 'detection_prob', 'birth_rate',
+                 'clutter_rate', 'state_space', 'transition', 'process_noise',
+                 'measurement_matrix', 'measurement_noise', 'resampler', 'ess_threshold', 'gate',
+                 'max_births', 'capacity', 'clutter_intensity', 'rng', '_scalar', '_noise_factor',
+                 '_whitener', '_measurement_whitener', '_scale', '_particles', '_spare',
+                 '_noise', '_white', '_white_norm', '_weights', '_accumulator', '_contribution',
+                 '_kernel', '_denominator', '_cdf', '_counts', '_size')
+
+    def __init__(self, num_particles=NUM_PARTICLES, survival_prob=SURVIVAL_PROB,
+                 detection_prob=DETECTION_PROB, birth_rate=BIRTH_RATE, clutter_rate=CLUTTER_RATE,
+                 state_space=STATE_SPACE, motion_std=1.0, measurement_std=MEASUREMENT_STD,
+                 resampler='systematic', ess_threshold=None, gate=None, max_births=None,
+                 rng=None, transition=None, process_noise=None, measurement_matrix=None,
+                 measurement_noise=None, clutter_intensity=None, capacity=None):
+        if resampler not in RESAMPLERS:
+            raise ValueError(f"resampler must be one of {sorted(RESAMPLERS)}, got {resampler!r}")
+        self.num_particles = int(num_particles)
+        self.survival_prob = survival_prob
+        self.detection_prob = detection_prob
+        self.birth_rate = birth_rate
+        self.clutter_rate = clutter_rate
+        self.resampler = resampler
+        self.ess_threshold = ess_threshold
+        self.gate = gate
+
+        self._scalar = all(m is None for m in (transition, process_noise, measurement_matrix,
+                                               measurement_noise))
+        self.state_space = np.asarray(state_space, dtype=float).reshape(-1, 2)
+        d = len(self.state_space) if transition is None else np.atleast_2d(transition).shape[0]
+        self.transition = np.eye(d) if transition is None else np.atleast_2d(
+            np.asarray(transition, dtype=float))
+        self.process_noise = (motion_std ** 2 * np.eye(d) if process_noise is None
+                              else np.atleast_2d(np.asarray(process_noise, dtype=float)))
+        self.measurement_matrix = (np.eye(d) if measurement_matrix is None
+                                   else np.atleast_2d(np.asarray(measurement_matrix, dtype=float)))
+        m = self.measurement_matrix.shape[0]
+        self.measurement_noise = (measurement_std ** 2 * np.eye(m) if measurement_noise is None
+                                  else np.atleast_2d(np.asarray(measurement_noise, dtype=float)))
+        if self.state_space.shape[0] != d:
+            raise ValueError(f"state_space needs one (low, high) range per state dimension ({d})")
+        if clutter_intensity is None:
+            # Uniform clutter over the ranges of the first m state coordinates
+            widths = self.state_space[:m, 1] - self.state_space[:m, 0]
+            clutter_intensity = clutter_rate / np.prod(widths)
+        self.clutter_intensity = clutter_intensity
+
+        # Cached factors: noise = N(0, I) @ L_Q^T; whitened u = x @ (L_R^-1 H)^T
+        self._noise_factor = np.linalg.cholesky(self.process_noise).T
+        chol_r = np.linalg.cholesky(self.measurement_noise)
+        self._measurement_whitener = np.linalg.inv(chol_r).T
+        self._whitener = (np.linalg.inv(chol_r) @ self.measurement_matrix).T
+        self._scale = detection_prob / ((2 * np.pi) ** (m / 2) * np.prod(np.diag(chol_r)))
+
+        if max_births is None:
+            # Six standard deviations above the mean Poisson birth count
+            mean = birth_rate * self.num_particles
+            max_births = int(np.ceil(mean + 6 * np.sqrt(mean))) + 1
+        self.max_births = int(max_births)
+        self.rng = np.random.default_rng(rng)
+
+        if capacity is None:
+            # With ess_threshold, room to carry up to 2 * num_particles unresampled
+            capacity = self.num_particles * (1 if ess_threshold is None else 2) + self.max_births
+        if capacity < self.num_particles + self.max_births:
+            raise ValueError("capacity must hold num_particles plus max_births")
+        self.capacity = int(capacity)
+        capacity = self.capacity
+        rows = max(1, MAX_KERNEL_ELEMENTS // capacity)
+        self._particles = np.empty((capacity, d))
+        self._spare = np.empty((capacity, d))
+        self._noise = np.empty((capacity, d))
+        self._white = np.empty((capacity, m))
+        self._white_norm = np.empty(capacity)
+        self._weights = np.empty(capacity)
+        self._accumulator = np.empty(capacity)
+        self._contribution = np.empty(capacity)
+        # Flat, so that the (rows, n) block taken from it is contiguous for any n
+        self._kernel = np.empty(rows * capacity)
+        self._denominator = np.empty(rows)
+        self._cdf = np.empty(capacity)
+        self._counts = np.empty(capacity, dtype=np.intp)
+        self.reset()
+
+    def reset(self, particles=None):
+        """
+        Restart from the given particle states, or uniformly over the state space.
+        """
+        n = self.num_particles
+        if particles is None:
+            self._uniform(self._particles[:n])
+        else:
+            self._particles[:n] = np.reshape(particles, (n, -1))
+        self._weights[:n] = 1.0 / n
+        self._size = n
+        self.cardinality = 1.0
+
+    @property
+    def particles(self):
+        particles = self._particles[:self._size]
+        return particles[:, 0] if self._scalar else particles
+
+    @property
+    def weights(self):
+        return self._weights[:self._size]
+
+    def step(self, measurements):
+        """
+        Run one predict, birth, update and resample cycle.
+
+        Parameters:
+            measurements (array-like): Current measurements, (M,) or (M, m).
+
+        Returns:
+            tuple: (particles, weights) views of the filter state.
+        """
+        n = self._size
+        # Predict step: x' = F x + L_Q e
+        particles = self._particles[:n]
+        np.matmul(particles, self.transition.T, out=self._spare[:n])
+        self.rng.standard_normal(out=self._noise[:n])
+        np.matmul(self._noise[:n], self._noise_factor, out=particles)
+        particles += self._spare[:n]
+        self._weights[:n] *= self.survival_prob * self.cardinality
+
+        # Birth step: births are written straight after the survivors
+        births = min(int(self.rng.poisson(self.birth_rate * n)), self.max_births)
+        if births:
+            self._uniform(self._particles[n:n + births])
+            self._weights[n:n + births] = 1.0 / (n + births)
+            n += births
+        particles = self._particles[:n]
+        weights = self._weights[:n]
+
+        # Update step on whitened coordinates
+        white = self._white[:n]
+        np.matmul(particles, self._whitener, out=white)
+        z = np.asarray(measurements, dtype=float).reshape(-1, white.shape[1])
+        v = z @ self._measurement_whitener
+        if self.gate is not None:
+            # Store the set in gate-key order. The resamplers return sorted
+            # indices, so the next scan's sort sees nearly sorted keys.
+            order = np.argsort(white[:, 0], kind='stable')
+            np.take(particles, order, axis=0, out=self._spare[:n])
+            np.take(weights, order, out=self._accumulator[:n])
+            self._particles, self._spare = self._spare, self._particles
+            self._weights, self._accumulator = self._accumulator, self._weights
+            particles = self._particles[:n]
+            weights = self._weights[:n]
+            np.matmul(particles, self._whitener, out=white)
+            weights[...] = _gated_update(white, v, weights, self.detection_prob,
+                                         self.clutter_intensity, self._scale, self.gate,
+                                         presorted=True)
+        else:
+            self._update(white, v, weights)
+
+        # Normalize and resample; the mass before normalization is the cardinality
+        self.cardinality = float(weights.sum())
+        weights /= self.cardinality
+        self._size = n
+        # Keep the set unresampled while its ESS is healthy and the next
+        # scan's births still fit; otherwise compact to num_particles
+        if (self.ess_threshold is not None and n + self.max_births <= self.capacity
+                and effective_sample_size(weights) >= self.ess_threshold * n):
+            return self.particles, self.weights
+        indices = RESAMPLERS[self.resampler](weights, self.num_particles, self.rng,
+                                             cdf=self._cdf[:n], counts=self._counts[:n])
+        np.take(particles, indices, axis=0, out=self._spare[:self.num_particles])
+        self._particles, self._spare = self._spare, self._particles
+        self._weights[:self.num_particles] = 1.0 / self.num_particles
+        self._size = self.num_particles
+        return self.particles, self.weights
+
+    def extract(self, n_targets=None):
+        """
+        Target estimates from the current particles.
+
+        Peaks are searched in a histogram of the whitened predicted
+        measurements with one-sigma cells; each estimate is the weighted mean
+        state of the particles around a peak.
+
+        Parameters:
+            n_targets (int): Number of estimates (default round(cardinality)).
+
+        Returns:
+            np.ndarray: Estimates, (k,) for the scalar model or (k, d).
+        """
+        if n_targets is None:
+            n_targets = int(round(self.cardinality))
+        particles = self._particles[:self._size]
+        estimates = _histogram_peaks(particles @ self._whitener, particles, self.weights,
+                                     n_targets, 1.0)
+        return estimates[:, 0] if self._scalar else estimates
+
+    def _update(self, white, v, weights):
+        # Same computation as _whitened_update, in the preallocated buffers
+        n = len(white)
+        accumulator = self._accumulator[:n]
+        np.multiply(weights, 1.0 - self.detection_prob, out=accumulator)
+        white_norm = None
+        if white.shape[1] > 1:
+            white_norm = np.einsum('ij,ij->i', white, white, out=self._white_norm[:n])
+        rows = len(self._denominator)
+        for start in range(0, len(v), rows):
+            block = v[start:start + rows]
+            kernel = self._kernel[:len(block) * n].reshape(len(block), n)
+            kernel = _squared_distances(block, white, out=kernel, u_norm=white_norm)
+            denominator = self._denominator[:len(block)]
+            kernel *= -0.5
+            np.exp(kernel, out=kernel)
+            kernel *= weights
+            kernel *= self._scale
+            kernel.sum(axis=1, out=denominator)
+            denominator += self.clutter_intensity
+            np.reciprocal(denominator, out=denominator)
+            contribution = self._contribution[:n]
+            np.dot(denominator, kernel, out=contribution)
+            accumulator += contribution
+        weights[...] = accumulator
+
+    def _uniform(self, out):
+        low, high = self.state_space[:, 0], self.state_space[:, 1]
+        self.rng.random(out=out)
+        out *= high - low
+        out += low
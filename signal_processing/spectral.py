@@ -0,0 +1,161 @@
+# signal_processing/spectral.py
+
+import numpy as np
+from scipy.fft import rfft, rfftfreq
+from scipy.signal import get_window
+from scipy.stats import entropy
+
+from .config import BANDS
+from .eeg import _band_masks
+
+# Upper bound on the number of samples framed at once by band_power_timeseries
+MAX_FRAME_ELEMENTS = 2**22
+
+def _density_scale(window, fs):
+    # One-sided density scaling, as in scipy.signal.welch
+    nperseg = len(window)
+    scale = np.full(nperseg // 2 + 1, 1.0 / (fs * np.sum(window ** 2)))
+    scale[1:len(scale) - (nperseg % 2 == 0)] *= 2
+    return scale
+
+def _periodograms(frames, window, scale):
+    """
+    Mean-detrended, windowed periodograms of frames (..., n_frames, nperseg)
+    in one batched rFFT.
+    """
+    frames = frames - frames.mean(axis=-1, keepdims=True)
+    return np.abs(rfft(frames * window, axis=-1)) ** 2 * scale
+
+class OnlineWelch:
+    """
+    Incremental Welch PSD estimate for unbounded sample streams.
+
+    Chunks of any length are fed to update(); complete segments are turned into
+    periodograms and folded into a running average, and only the partial
+    segment at the end of the stream is kept. Memory does not depend on the
+    stream length. With forgetting=1.0 the estimate equals scipy.signal.welch
+    over everything seen so far (same defaults as band_power); with
+    forgetting < 1 older segments are down-weighted exponentially.
+    """
+
+    def __init__(self, fs, nperseg=None, noverlap=None, window='hann', forgetting=1.0):
+        self.fs = fs
+        self.nperseg = int(nperseg if nperseg is not None else fs * 2)
+        self.noverlap = self.nperseg // 2 if noverlap is None else int(noverlap)
+        if not 0 <= self.noverlap < self.nperseg:
+            raise ValueError("noverlap must be in [0, nperseg)")
+        if not 0.0 < forgetting <= 1.0:
+            raise ValueError("forgetting must be in (0, 1]")
+        self.forgetting = forgetting
+        self.window = get_window(window, self.nperseg)
+        self.freqs = rfftfreq(self.nperseg, 1.0 / fs)
+        self._scale = _density_scale(self.window, fs)
+        self.reset()
+
+    def reset(self):
+        """
+        Discard all accumulated segments and buffered samples.
+        """
+        self._buffer = None
+        self._sum = None
+        self._weight = 0.0
+        self.n_segments = 0
+
+    def update(self, chunk):
+        """
+        Add the next chunk of samples, with time on the last axis.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if self._buffer is None:
+            self._buffer = np.empty(chunk.shape[:-1] + (0,))
+        elif self._buffer.shape[:-1] != chunk.shape[:-1]:
+            raise ValueError(f"chunk shape {chunk.shape} does not match the stream's "
+                             f"channel shape {self._buffer.shape[:-1]}")
+        data = np.concatenate((self._buffer, chunk), axis=-1)
+        step = self.nperseg - self.noverlap
+        n_new = 0 if data.shape[-1] < self.nperseg else (data.shape[-1] - self.nperseg) // step + 1
+        if n_new:
+            frames = np.lib.stride_tricks.sliding_window_view(data, self.nperseg, axis=-1)
+            frames = frames[..., ::step, :][..., :n_new, :]
+            periodograms = _periodograms(frames, self.window, self._scale)
+            decay = self.forgetting ** np.arange(n_new - 1, -1, -1)
+            batch = np.einsum('...sf,s->...f', periodograms, decay)
+            total = self.forgetting ** n_new
+            self._sum = batch if self._sum is None else total * self._sum + batch
+            self._weight = total * self._weight + decay.sum()
+            self.n_segments += n_new
+        self._buffer = data[..., n_new * step:].copy()
+
+    @property
+    def psd(self):
+        """
+        Current PSD estimate, shape (..., n_freqs); None before the first segment.
+        """
+        return None if self._sum is None else self._sum / self._weight
+
+    def band_power(self, band):
+        """
+        Power in one band (fmin, fmax), as eeg.band_power.
+        """
+        return self.band_powers([band])[..., 0]
+
+    def band_powers(self, bands=BANDS):
+        """
+        Power in several bands, shape (..., n_bands), as eeg.band_powers.
+        """
+        return self._require_psd() @ _band_masks(self.freqs, bands).T
+
+    def spectral_entropy(self):
+        """
+        Spectral entropy of the current estimate, as feature_extraction.spectral_entropy.
+        """
+        psd = self._require_psd()
+        return entropy(psd / np.sum(psd, axis=-1, keepdims=True), axis=-1)
+
+    def _require_psd(self):
+        if self._sum is None:
+            raise ValueError("no complete segment has been accumulated yet")
+        return self.psd
+
+def band_power_timeseries(eeg, fs, bands=BANDS, win=2.0, hop=0.25, window='hann', axis=-1):
+    """
+    Band power over sliding windows, from one periodogram per window.
+    
+    Frames are zero-copy strided views of the signal and are transformed in
+    batched rFFTs, so the cost grows linearly with the recording length.
+    Window i covers samples [i * hop, i * hop + win) in seconds. For
+    win=2.0 each value equals band_power on that window.
+    
+    Parameters:
+        eeg (np.ndarray): EEG signal, e.g. (channels, samples).
+        fs (int): Sampling frequency.
+        bands (dict or sequence): Mapping of band name to (fmin, fmax), or a
+            sequence of (fmin, fmax) pairs.
+        win (float): Window length in seconds.
+        hop (float): Step between window starts in seconds.
+        window (str): Taper applied to each window.
+        axis (int): Time axis of eeg.
+    
+    Returns:
+        np.ndarray: Band powers of shape (..., n_windows, n_bands), e.g.
+        (channels, n_windows, n_bands); n_windows is 0 for signals shorter
+        than one window.
+    """
+    eeg = np.moveaxis(np.asarray(eeg, dtype=float), axis, -1)
+    nwin, nhop = int(round(win * fs)), int(round(hop * fs))
+    if nwin < 1 or nhop < 1:
+        raise ValueError("win and hop must each span at least one sample")
+    n_windows = 0 if eeg.shape[-1] < nwin else (eeg.shape[-1] - nwin) // nhop + 1
+    taper = get_window(window, nwin)
+    scale = _density_scale(taper, fs)
+    masks = _band_masks(rfftfreq(nwin, 1.0 / fs), bands).T
+    out = np.empty(eeg.shape[:-1] + (n_windows, masks.shape[1]))
+    if n_windows == 0:
+        # Shorter than one window: nothing to frame
+        return out
+    frames = np.lib.stride_tricks.sliding_window_view(eeg, nwin, axis=-1)[..., ::nhop, :]
+    batch = max(1, MAX_FRAME_ELEMENTS // (nwin * max(1, int(np.prod(eeg.shape[:-1])))))
+    for start in range(0, n_windows, batch):
+        stop = min(n_windows, start + batch)
+        out[..., start:stop, :] = _periodograms(frames[..., start:stop, :], taper, scale) @ masks
+    return out
@@ -0,0 +1,95 @@
+# signal_processing/streaming.py
+
+import numpy as np
+from scipy.signal import lfilter, sosfilt
+
+from .design import firwin_design
+from .filters import _butter
+
+class StreamingFilter:
+    """
+    Causal filter that carries its state between chunks.
+
+    Filtering a signal chunk by chunk with process() gives the same output as
+    filtering the concatenated signal in one call, starting from zero state.
+    Chunks may hold many channels, e.g. (channels, samples); time is the last axis.
+    Pass either transfer-function coefficients (b, a) or writable second-order
+    sections sos (sosfilt rejects read-only ones; see design.butter_sos).
+    """
+
+    def __init__(self, b=None, a=None, sos=None):
+        if (sos is None) == (b is None):
+            raise ValueError("pass either (b, a) or sos")
+        self.b = b
+        self.a = np.ones(1) if a is None and b is not None else a
+        self.sos = None if sos is None else np.asarray(sos)
+        self.zi = None
+
+    def process(self, chunk):
+        """
+        Filter the next chunk of samples.
+
+        Parameters:
+            chunk (np.ndarray): Input samples with time on the last axis.
+
+        Returns:
+            np.ndarray: Filtered chunk, same shape as the input.
+        """
+        chunk = np.asarray(chunk)
+        channels = chunk.shape[:-1]
+        if self.zi is None:
+            if self.sos is not None:
+                self.zi = np.zeros((len(self.sos),) + channels + (2,))
+            else:
+                order = max(len(self.a), len(self.b)) - 1
+                self.zi = np.zeros(channels + (order,))
+        elif self._channels() != channels:
+            raise ValueError(f"chunk shape {chunk.shape} does not match the stream's "
+                             f"channel shape {self._channels()}")
+        if self.sos is not None:
+            y, self.zi = sosfilt(self.sos, chunk, axis=-1, zi=self.zi)
+        else:
+            y, self.zi = lfilter(self.b, self.a, chunk, axis=-1, zi=self.zi)
+        return y
+
+    def _channels(self):
+        return self.zi.shape[1:-1] if self.sos is not None else self.zi.shape[:-1]
+
+    def reset(self):
+        """
+        Forget the carried state so the next chunk starts a new stream.
+        """
+        self.zi = None
+
+def _split(coeffs, output):
+    return (None, None, coeffs) if output == 'sos' else (coeffs[0], coeffs[1], None)
+
+class StreamingBandpass(StreamingFilter):
+    """
+    Streaming counterpart of filters.bandpass_filter.
+    """
+
+    def __init__(self, lowcut, highcut, fs, order=4, output='ba'):
+        nyquist = 0.5 * fs
+        coeffs = _butter(order, [lowcut / nyquist, highcut / nyquist], 'band', output)
+        super().__init__(*_split(coeffs, output))
+
+class StreamingHighpass(StreamingFilter):
+    """
+    Streaming counterpart of eeg.highpass_filter.
+    """
+
+    def __init__(self, cutoff, fs, order=4, output='ba'):
+        nyquist = 0.5 * fs
+        coeffs = _butter(order, cutoff / nyquist, 'high', output)
+        super().__init__(*_split(coeffs, output))
+
+class StreamingFIR(StreamingFilter):
+    """
+    Streaming counterpart of filters.fir_filter.
+    """
+
+    def __init__(self, lowcut, highcut, fs, numtaps=101):
+        nyquist = 0.5 * fs
+        taps = firwin_design(numtaps, [lowcut / nyquist, highcut / nyquist], pass_zero=False)
+        super().__init__(taps)
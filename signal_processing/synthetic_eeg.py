@@ -0,0 +1,270 @@
+# signal_processing/synthetic_eeg.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .config import FS
+
+# Oscillators of simulate_eeg: one per band (delta, theta, alpha, beta, gamma)
+OSCILLATOR_FREQUENCIES = (2.0, 6.0, 10.0, 20.0, 40.0)
+OSCILLATOR_AMPLITUDES = (1.5, 1.0, 0.8, 0.5, 0.3)
+NOISE_STD = 0.2
+# Per-channel amplitudes are drawn uniformly within this relative range
+AMPLITUDE_JITTER = 0.3
+# Samples generated per chunk when writing files (seconds)
+CHUNK_DURATION = 10.0
+# Default transient injected by EegStream (e.g. an eye blink)
+ARTIFACT_AMPLITUDE = 20.0
+ARTIFACT_DURATION = 0.3
+
+def _seed_sequence(seed):
+    return seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+
+class SyntheticEeg:
+    """
+    Multichannel EEG generator built from a bank of phase-continuous oscillators.
+
+    Each channel mixes the oscillators of simulate_eeg with its own random
+    amplitudes and phases, plus white noise. Every channel draws from its own
+    generator (spawned from one SeedSequence), so the output depends only on
+    the seed, never on the chunk sizes or the number of worker threads.
+
+    The oscillator state is a complex phasor per channel and oscillator. A
+    chunk of n samples is one matmul of the phasors with cached cos/sin
+    tables of length n, after which the phasors are rotated by n samples, so
+    consecutive chunks join without phase jumps.
+    """
+
+    def __init__(self, n_channels, fs=FS, frequencies=OSCILLATOR_FREQUENCIES,
+                 amplitudes=OSCILLATOR_AMPLITUDES, amplitude_jitter=AMPLITUDE_JITTER,
+                 noise_std=NOISE_STD, seed=None, dtype=np.float32):
+        self.n_channels = int(n_channels)
+        self.fs = fs
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        self.amplitudes = np.asarray(amplitudes, dtype=float)
+        if self.frequencies.shape != self.amplitudes.shape:
+            raise ValueError("frequencies and amplitudes must have the same length")
+        self.amplitude_jitter = amplitude_jitter
+        self.noise_std = noise_std
+        self.dtype = np.dtype(dtype)
+        self.seed = _seed_sequence(seed)
+        self._channel_seeds = self.seed.spawn(self.n_channels)
+        self._omega = 2 * np.pi * self.frequencies / fs
+        self._tables = None
+        self.reset()
+
+    def reset(self):
+        """
+        Restart the signal from sample 0 with the same random parameters.
+        """
+        self._rngs = [np.random.default_rng(s) for s in self._channel_seeds]
+        n_osc = len(self.frequencies)
+        gains = np.empty((self.n_channels, n_osc))
+        phases = np.empty((self.n_channels, n_osc))
+        for rng, gain, phase in zip(self._rngs, gains, phases):
+            gain[:] = rng.uniform(1 - self.amplitude_jitter, 1 + self.amplitude_jitter, n_osc)
+            phase[:] = rng.uniform(0, 2 * np.pi, n_osc)
+        # Sine oscillators: amplitude * sin(phase + omega * k) = Re(w * exp(1j * omega * k))
+        self._phasors = self.amplitudes * gains * np.exp(1j * (phases - np.pi / 2))
+        self.n_samples = 0
+
+    def _coefficients(self, n):
+        # [cos; sin] tables for n samples, and the rotation applied after them
+        if self._tables is None or self._tables[0] != n:
+            k = np.arange(n)
+            angles = np.outer(self._omega, k)
+            tables = np.concatenate((np.cos(angles), np.sin(angles))).astype(self.dtype)
+            self._tables = (n, tables, np.exp(1j * self._omega * n))
+        return self._tables[1], self._tables[2]
+
+    def generate(self, n_samples, out=None, n_workers=1):
+        """
+        Produce the next n_samples of every channel.
+
+        Parameters:
+            n_samples (int): Chunk length.
+            out (np.ndarray): Optional (n_channels, n_samples) output, e.g. a
+                slice of a memmap.
+            n_workers (int): Threads to split the channels across.
+
+        Returns:
+            np.ndarray: (n_channels, n_samples) chunk.
+        """
+        shape = (self.n_channels, n_samples)
+        if out is None:
+            out = np.empty(shape, dtype=self.dtype)
+        elif out.shape != shape or out.dtype != self.dtype:
+            raise ValueError(f"out must be a {self.dtype} array of shape {shape}")
+        if n_workers == 1:
+            self._fill(out, 0, self.n_channels)
+        else:
+            with ThreadPoolExecutor(n_workers) as pool:
+                self._fill_parallel(out, pool, n_workers)
+        self._advance(n_samples)
+        return out
+
+    def _fill_parallel(self, out, pool, n_workers):
+        bounds = np.linspace(0, self.n_channels, n_workers + 1).astype(int)
+        list(pool.map(self._fill, [out] * n_workers, bounds[:-1], bounds[1:]))
+
+    def _fill(self, out, start, stop):
+        # Noise first (per-channel streams), then the oscillators in one matmul
+        rows = out[start:stop]
+        tables, _ = self._coefficients(out.shape[-1])
+        for rng, row in zip(self._rngs[start:stop], rows):
+            rng.standard_normal(out=row, dtype=self.dtype)
+        rows *= self.noise_std
+        phasors = self._phasors[start:stop]
+        weights = np.concatenate((phasors.real, -phasors.imag), axis=1).astype(self.dtype)
+        rows += weights @ tables
+
+    def _advance(self, n):
+        _, rotation = self._coefficients(n)
+        self._phasors *= rotation
+        self.n_samples += n
+
+def generate_eeg_file(path, n_channels, duration, fs=FS, chunk_duration=CHUNK_DURATION,
+                      seed=None, n_workers=1, dtype=np.float32, **kwargs):
+    """
+    Write synthetic multichannel EEG to disk chunk by chunk.
+
+    Only one chunk is held in memory, so the file can be far larger than RAM.
+    A path ending in '.npy' gets an .npy header (readable with
+    np.load(path, mmap_mode='r')); any other path is a raw memmap.
+
+    Parameters:
+        path (str): Output file.
+        n_channels (int): Number of channels.
+        duration (float): Length in seconds.
+        fs (int): Sampling frequency.
+        chunk_duration (float): Seconds generated per chunk.
+        seed (int or SeedSequence): Seed the channels are spawned from.
+        n_workers (int): Threads to split the channels across.
+        dtype (np.dtype): Sample type (default float32).
+        **kwargs: Further SyntheticEeg settings (amplitudes, noise_std, ...).
+
+    Returns:
+        np.memmap: The written (n_channels, samples) array.
+    """
+    n_total = int(round(duration * fs))
+    shape = (int(n_channels), n_total)
+    if str(path).endswith('.npy'):
+        data = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    else:
+        data = np.memmap(path, mode='w+', dtype=dtype, shape=shape)
+    source = SyntheticEeg(n_channels, fs, seed=seed, dtype=dtype, **kwargs)
+    chunk = max(1, int(round(chunk_duration * fs)))
+    pool = ThreadPoolExecutor(n_workers) if n_workers > 1 else None
+    try:
+        for start in range(0, n_total, chunk):
+            stop = min(n_total, start + chunk)
+            out = data[:, start:stop]
+            if pool is None:
+                source._fill(out, 0, source.n_channels)
+            else:
+                source._fill_parallel(out, pool, n_workers)
+            source._advance(stop - start)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    data.flush()
+    return data
+
+class EegStream:
+    """
+    Endless source of (n_channels, chunk_size) EEG blocks, as an iterator or
+    async iterator.
+
+    Blocks come from a SyntheticEeg, so phase is continuous across blocks.
+    With speed=1.0 blocks are released at the sampling rate, against
+    absolute deadlines so that pacing errors do not accumulate; other values
+    scale the rate and None emits as fast as possible.
+
+    Optional disturbances are drawn from a separate generator and leave the
+    underlying signal unchanged: drift_std adds a per-channel baseline random
+    walk (std per sqrt(second)), ramped linearly across each block, and
+    artifact_rate adds Hann-shaped transients of artifact_amplitude at that
+    mean rate per channel and second. Transients may span block boundaries.
+    """
+
+    def __init__(self, n_channels, fs=FS, chunk_size=None, speed=1.0, max_chunks=None,
+                 drift_std=0.0, artifact_rate=0.0, artifact_amplitude=ARTIFACT_AMPLITUDE,
+                 artifact_duration=ARTIFACT_DURATION, seed=None, **kwargs):
+        signal_seed, disturbance_seed = _seed_sequence(seed).spawn(2)
+        self.source = SyntheticEeg(n_channels, fs, seed=signal_seed, **kwargs)
+        self.fs = fs
+        self.chunk_size = int(chunk_size if chunk_size is not None else fs // 10)
+        self.speed = speed
+        self.max_chunks = max_chunks
+        self.drift_std = drift_std
+        self.artifact_rate = artifact_rate
+        self.artifact_amplitude = artifact_amplitude
+        self._artifact = np.hanning(max(3, int(round(artifact_duration * fs))))
+        self._rng = np.random.default_rng(disturbance_seed)
+        self._baseline = np.zeros((n_channels, 1))
+        self._pending = np.zeros((n_channels, len(self._artifact)))
+        self._start = None
+        self.n_chunks = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._next_chunk()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            delay = self._delay()
+        except StopIteration:
+            raise StopAsyncIteration
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._next_chunk()
+
+    def _delay(self):
+        # Seconds to wait before the next block may be released
+        if self.max_chunks is not None and self.n_chunks >= self.max_chunks:
+            raise StopIteration
+        if self.speed is None:
+            return 0.0
+        now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        due = self._start + self.n_chunks * self.chunk_size / (self.fs * self.speed)
+        return due - now
+
+    def _next_chunk(self):
+        n = self.chunk_size
+        chunk = self.source.generate(n)
+        if self.drift_std:
+            step = self.drift_std * np.sqrt(n / self.fs)
+            target = self._baseline + step * self._rng.standard_normal(self._baseline.shape)
+            ramp = np.arange(1, n + 1) / n
+            chunk += (self._baseline + (target - self._baseline) * ramp).astype(chunk.dtype)
+            self._baseline = target
+        if self.artifact_rate:
+            chunk += self._artifacts(n).astype(chunk.dtype)
+        self.n_chunks += 1
+        return chunk
+
+    def _artifacts(self, n):
+        width = len(self._artifact)
+        buffer = np.zeros((len(self._pending), n + width))
+        buffer[:, :width] = self._pending
+        counts = self._rng.poisson(self.artifact_rate * n / self.fs, len(buffer))
+        channels = np.repeat(np.arange(len(buffer)), counts)
+        starts = self._rng.integers(0, n, len(channels))
+        signs = self._rng.choice([-1.0, 1.0], len(channels))
+        np.add.at(buffer, (channels[:, None], starts[:, None] + np.arange(width)),
+                  signs[:, None] * self.artifact_amplitude * self._artifact)
+        self._pending = buffer[:, n:]
+        return buffer[:, :n]
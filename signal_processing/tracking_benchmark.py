@@ -0,0 +1,193 @@
+# signal_processing/tracking_benchmark.py
+
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .phd_filter import (CLUTTER_RATE, DETECTION_PROB, STATE_SPACE, PhdFilter,
+                         simulate_measurement_sequence)
+
+# OSPA cut-off distance (penalty per missed or false target) and order
+OSPA_CUTOFF = 10.0
+OSPA_ORDER = 1
+# Per-scan latency percentiles reported by benchmark
+LATENCY_PERCENTILES = (50, 90, 99)
+
+BenchmarkResult = namedtuple("BenchmarkResult", ["scenario", "settings", "ospa",
+                                                 "cardinality_error", "latency",
+                                                 "scans_per_second"])
+
+def _points(x):
+    x = np.asarray(x, dtype=float)
+    return x.reshape(len(x), -1) if x.ndim > 1 else x.reshape(-1, 1)
+
+def ospa_distance(estimates, truths, cutoff=OSPA_CUTOFF, order=OSPA_ORDER):
+    """
+    Optimal sub-pattern assignment (OSPA) distance between two point sets.
+
+    All pairwise distances are computed at once and the optimal assignment
+    is solved with scipy.optimize.linear_sum_assignment.
+
+    Parameters:
+        estimates (array-like): Estimated states, (k,) or (k, d).
+        truths (array-like): True states, (n,) or (n, d).
+        cutoff (float): Distance cut-off, also the cost of a cardinality error.
+        order (float): OSPA order p.
+
+    Returns:
+        float: OSPA distance in [0, cutoff].
+    """
+    x, y = _points(estimates), _points(truths)
+    if len(x) > len(y):
+        x, y = y, x
+    m, n = len(x), len(y)
+    if n == 0:
+        return 0.0
+    if m == 0:
+        return float(cutoff)
+    distances = np.sqrt(np.sum((x[:, None, :] - y[None, :, :]) ** 2, axis=-1))
+    cost = np.minimum(distances, cutoff) ** order
+    rows, cols = linear_sum_assignment(cost)
+    total = cost[rows, cols].sum() + cutoff ** order * (n - m)
+    return float((total / n) ** (1.0 / order))
+
+def crossing_scenario(n_steps, state_space=STATE_SPACE):
+    """
+    Two targets crossing the state space in opposite directions.
+
+    Returns:
+        np.ndarray: Trajectories (n_steps, 2), as for simulate_measurement_sequence.
+    """
+    low, high = state_space
+    path = np.linspace(low + 0.2 * (high - low), high - 0.2 * (high - low), n_steps)
+    return np.stack((path, path[::-1]), axis=1)
+
+def birth_scenario(n_steps, state_space=STATE_SPACE):
+    """
+    One target present throughout, a second born after a third of the scans
+    and a third born after two thirds.
+    """
+    low, high = state_space
+    trajectories = low + (high - low) * np.tile([0.2, 0.5, 0.8], (n_steps, 1))
+    trajectories[:n_steps // 3, 1] = np.nan
+    trajectories[:2 * n_steps // 3, 2] = np.nan
+    return trajectories
+
+def death_scenario(n_steps, state_space=STATE_SPACE):
+    """
+    Three targets; one disappears after a third of the scans and another
+    after two thirds.
+    """
+    low, high = state_space
+    trajectories = low + (high - low) * np.tile([0.2, 0.5, 0.8], (n_steps, 1))
+    trajectories[n_steps // 3:, 1] = np.nan
+    trajectories[2 * n_steps // 3:, 2] = np.nan
+    return trajectories
+
+SCENARIOS = {
+    'crossing': crossing_scenario,
+    'birth': birth_scenario,
+    'death': death_scenario,
+}
+
+def run_scenario(trajectories, n_runs=1, seed=None, cutoff=OSPA_CUTOFF, order=OSPA_ORDER,
+                 detection_prob=DETECTION_PROB, clutter_rate=CLUTTER_RATE,
+                 state_space=STATE_SPACE, **filter_kwargs):
+    """
+    Track simulated measurements of known trajectories and score every scan.
+
+    Each scan is timed from the filter step through target extraction.
+
+    Parameters:
+        trajectories (np.ndarray): True positions (n_steps, n_targets), NaN where absent.
+        n_runs (int): Number of Monte Carlo runs.
+        seed (int): Seed; the same seed gives the same measurements whatever
+            the filter settings, so settings are compared on equal data.
+        cutoff (float): OSPA cut-off.
+        order (float): OSPA order.
+        detection_prob (float): Detection probability (simulation and filter).
+        clutter_rate (float): Mean clutter returns per scan (simulation and filter).
+        state_space (tuple): (low, high) range of the scenario.
+        **filter_kwargs: Further PhdFilter settings, e.g. num_particles or gate.
+
+    Returns:
+        tuple: (ospa, cardinality, latency), each of shape (n_runs, n_steps);
+        latency is in seconds.
+    """
+    trajectories = np.asarray(trajectories, dtype=float)
+    n_steps = len(trajectories)
+    ospa = np.empty((n_runs, n_steps))
+    cardinality = np.empty((n_runs, n_steps))
+    latency = np.empty((n_runs, n_steps))
+    for run, child in enumerate(np.random.SeedSequence(seed).spawn(n_runs)):
+        measurement_seed, filter_seed = child.spawn(2)
+        values, offsets = simulate_measurement_sequence(
+            trajectories, detection_prob=detection_prob, clutter_rate=clutter_rate,
+            state_space=state_space, rng=np.random.default_rng(measurement_seed))
+        filt = PhdFilter(detection_prob=detection_prob, clutter_rate=clutter_rate,
+                         state_space=state_space, rng=np.random.default_rng(filter_seed),
+                         **filter_kwargs)
+        for k in range(n_steps):
+            start = time.perf_counter()
+            filt.step(values[offsets[k]:offsets[k + 1]])
+            estimates = filt.extract()
+            latency[run, k] = time.perf_counter() - start
+            truth = trajectories[k][np.isfinite(trajectories[k])]
+            ospa[run, k] = ospa_distance(estimates, truth, cutoff, order)
+            cardinality[run, k] = filt.cardinality
+    return ospa, cardinality, latency
+
+def benchmark(settings=({},), scenarios=SCENARIOS, n_steps=60, n_runs=5, seed=0,
+              percentiles=LATENCY_PERCENTILES, **kwargs):
+    """
+    Run every filter setting on every scenario.
+
+    Parameters:
+        settings (sequence): Dicts of PhdFilter keyword arguments to compare,
+            e.g. [{'num_particles': 250}, {'num_particles': 1000, 'gate': 5}].
+        scenarios (dict): Mapping of name to a function n_steps -> trajectories.
+        n_steps (int): Scans per run.
+        n_runs (int): Monte Carlo runs per setting and scenario.
+        seed (int): Seed shared by all settings.
+        percentiles (sequence): Latency percentiles to report.
+        **kwargs: Passed to run_scenario (cutoff, clutter_rate, ...).
+
+    Returns:
+        list: BenchmarkResult per (setting, scenario) with the mean OSPA, the
+        mean absolute cardinality error, a {percentile: seconds} latency dict
+        and the throughput in scans per second.
+    """
+    results = []
+    for setting in settings:
+        for name, scenario in scenarios.items():
+            trajectories = scenario(n_steps)
+            ospa, cardinality, latency = run_scenario(trajectories, n_runs=n_runs, seed=seed,
+                                                      **kwargs, **setting)
+            n_targets = np.isfinite(trajectories).sum(axis=1)
+            results.append(BenchmarkResult(
+                scenario=name,
+                settings=dict(setting),
+                ospa=float(ospa.mean()),
+                cardinality_error=float(np.abs(cardinality - n_targets).mean()),
+                latency=dict(zip(percentiles, np.percentile(latency, percentiles).tolist())),
+                scans_per_second=float(latency.size / latency.sum())))
+    return results
+
+def pareto_frontier(results, percentile=LATENCY_PERCENTILES[0]):
+    """
+    Results not beaten by any other on both OSPA and latency.
+
+    Parameters:
+        results (sequence): BenchmarkResult items, typically of one scenario.
+        percentile (int): Latency percentile to compare on.
+
+    Returns:
+        list: Frontier results, fastest first.
+    """
+    frontier = []
+    for result in sorted(results, key=lambda r: (r.latency[percentile], r.ospa)):
+        if not frontier or result.ospa < frontier[-1].ospa:
+            frontier.append(result)
+    return frontier
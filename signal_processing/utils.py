@@ -2,19 +2,444 @@
 
 import numpy as np
 import pywt
+from scipy.fft import fft, ifft, irfft, next_fast_len, rfft
 
-def compute_wavelet_transform(data, scales, wavelet='cmor', sampling_period=1.0):
+from .config import BANDS
+from .design import DesignCache
+from .filters import FFT_MAX_ELEMENTS
+
+# Maximum number of per-scale wavelet frequency responses kept in memory, and
+# their maximum total size
+WAVELET_CACHE_SIZE = 256
+WAVELET_CACHE_BYTES = 2**27
+# Sampling precision (2**precision points) of the integrated wavelet, pywt.cwt's default
+WAVELET_PRECISION = 12
+
+# Input samples per block of the chunked scalogram (rounded up to the decimation)
+CWT_BLOCK_SIZE = 2**15
+
+# Log-spaced scalogram defaults: scales per octave, wavelet, and the minimum
+# ratio of each scale's output rate to its centre frequency
+VOICES_PER_OCTAVE = 8
+SCALOGRAM_WAVELET = 'cmor1.5-1.0'
+SCALOGRAM_RATE_MARGIN = 4.0
+
+# Kept apart from the filter design cache: responses are signal-length sized,
+# so the cache is bounded in bytes as well as entries
+_wavelet_cache = DesignCache(WAVELET_CACHE_SIZE, WAVELET_CACHE_BYTES)
+
+def _wavelet_name(wavelet):
+    return wavelet if isinstance(wavelet, str) else wavelet.name
+
+def _integrated_wavelet(wavelet, precision):
+    """
+    Integrated wavelet and its sample grid, as used by pywt.cwt.
+    """
+    def factory():
+        w = wavelet
+        if isinstance(w, str):
+            w = pywt.DiscreteContinuousWavelet(w)
+        int_psi, x = pywt.integrate_wavelet(w, precision=precision)
+        return np.conj(int_psi) if w.complex_cwt else int_psi, np.asarray(x, dtype=float)
+    return _wavelet_cache.get(('int_psi', _wavelet_name(wavelet), precision), factory)
+
+def _scale_kernel(wavelet, scale, precision):
+    # Integrated wavelet resampled at one scale and reversed (pywt.cwt's kernel)
+    int_psi, x = _integrated_wavelet(wavelet, precision)
+    step = x[1] - x[0]
+    j = (np.arange(scale * (x[-1] - x[0]) + 1) / (scale * step)).astype(int)
+    return int_psi[j[j < int_psi.size]][::-1]
+
+def _roots(nfft):
+    # exp(2j * pi * m / nfft) for m = 0 .. nfft - 1
+    return np.exp(2j * np.pi * np.arange(nfft) / nfft)
+
+def _unit_roots(nfft):
+    return _wavelet_cache.get(('roots', nfft), lambda: _roots(nfft))
+
+def _scale_response(wavelet, scale, nfft, real, dtype, precision, roots=None):
+    """
+    Frequency response giving pywt.cwt's coefficients for one scale.
+
+    pywt.cwt convolves with the kernel, takes -sqrt(scale) times the first
+    difference and trims (K - 2) / 2 samples from the front. The difference
+    and the trim are folded into the response as a phase ramp, so the
+    coefficients are the first n samples of one inverse FFT.
+
+    Responses are cached unless roots (_roots(nfft)) is given, which builds
+    a one-off response that is not kept.
+    """
+    def factory(roots):
+        kernel = _scale_kernel(wavelet, scale, precision)
+        if kernel.size < 2:
+            raise ValueError(f"Selected scale of {scale} too small.")
+        shift = (kernel.size - 2) // 2
+        if real:
+            response = rfft(kernel, nfft)
+        else:
+            response = fft(kernel, nfft)
+        # x[t + shift + 1] - x[t + shift] as a phase factor, from exact integer phases
+        k = np.arange(response.size)
+        response *= -np.sqrt(scale) * (roots[k * (shift + 1) % nfft] - roots[k * shift % nfft])
+        return response.astype(np.result_type(dtype, np.complex64))
+    if roots is not None:
+        return factory(roots)
+    key = ('cwt', _wavelet_name(wavelet), precision, float(scale), nfft, real,
+           np.dtype(dtype).str)
+    return _wavelet_cache.get(key, lambda: factory(_unit_roots(nfft)))
+
+def compute_wavelet_transform(data, scales, wavelet='cmor', sampling_period=1.0, axis=-1,
+                              dtype=np.float64, method='fft', precision=WAVELET_PRECISION,
+                              workers=None):
     """
     Compute the continuous wavelet transform.
-    
+
+    With method='fft' the signal is transformed once, multiplied by cached
+    per-scale frequency responses and brought back with batched inverse FFTs;
+    the result equals pywt.cwt up to floating-point rounding. method='conv'
+    calls pywt.cwt directly.
+
     Parameters:
-        data (np.ndarray): Input signal.
+        data (np.ndarray): Input signal, e.g. (samples,) or (channels, samples).
         scales (np.ndarray): Array of scales.
         wavelet (str): Wavelet name (default 'cmor').
         sampling_period (float): Sampling period.
-    
+        axis (int): Time axis of data.
+        dtype (np.dtype): np.float64, or np.float32 to compute and return
+            float32 / complex64 coefficients at half the memory.
+        method (str): 'fft' or 'conv'.
+        precision (int): Wavelet sampling precision, as in pywt.cwt.
+        workers (int): Threads used by scipy.fft (-1 for all cores).
+
+    Returns:
+        tuple: (coefficients, frequencies); coefficients have shape
+        (n_scales,) + data.shape.
+    """
+    if method == 'conv':
+        return pywt.cwt(data, scales, wavelet, sampling_period=sampling_period, axis=axis,
+                        precision=precision)
+    if method != 'fft':
+        raise ValueError(f"method must be 'fft' or 'conv', got {method!r}")
+    scales = np.atleast_1d(scales)
+    if np.any(scales <= 0):
+        raise ValueError("`scales` must only include positive values")
+    real_dtype = np.dtype(dtype)
+    data = np.asarray(data)
+    data = data.astype(np.result_type(data.dtype, real_dtype) if np.iscomplexobj(data)
+                       else real_dtype, copy=False)
+    int_psi, _ = _integrated_wavelet(wavelet, precision)
+    real = not (np.iscomplexobj(int_psi) or np.iscomplexobj(data))
+    out_dtype = real_dtype if real else np.result_type(real_dtype, np.complex64)
+
+    moved = np.moveaxis(data, axis, -1)
+    out = np.empty((len(scales),) + moved.shape, dtype=out_dtype)
+    _fft_cwt(moved, scales, wavelet, real, real_dtype, precision, workers, out)
+    frequencies = np.atleast_1d(pywt.scale2frequency(wavelet, scales, precision))
+    return np.moveaxis(out, -1, axis if axis < 0 else axis + 1), frequencies / sampling_period
+
+def _fft_cwt(segment, scales, wavelet, real, dtype, precision, workers, out, rows=None,
+             start=0, step=1, reduce=None):
+    """
+    CWT of segment (..., m) by FFT, written to out[rows] of shape
+    (n_scales, ..., k) as coefficient samples start, start + step, ...
+    (k of them), optionally passed through reduce.
+    """
+    lead, m = segment.shape[:-1], segment.shape[-1]
+    rows = np.arange(len(scales)) if rows is None else rows
+    stop = start + step * (out.shape[-1] - 1) + 1
+    # Kernels grow with the scale; one FFT size fits the longest
+    nfft = next_fast_len(m + _scale_kernel(wavelet, max(scales), precision).size - 1, real=real)
+    spectrum = rfft(segment, nfft, workers=workers) if real else fft(segment, nfft, workers=workers)
+    inverse = irfft if real else ifft
+    group = max(1, FFT_MAX_ELEMENTS // (nfft * max(1, int(np.prod(lead)))))
+    for first in range(0, len(scales), group):
+        batch = scales[first:first + group]
+        responses = np.stack([_scale_response(wavelet, s, nfft, real, dtype, precision)
+                              for s in batch])
+        responses = responses.reshape((len(batch),) + (1,) * len(lead) + (-1,))
+        coefficients = inverse(spectrum * responses, nfft, overwrite_x=True, workers=workers)
+        coefficients = coefficients[..., start:stop:step]
+        out[rows[first:first + group]] = coefficients if reduce is None else reduce(coefficients)
+
+def _power(coefficients):
+    if np.iscomplexobj(coefficients):
+        return coefficients.real ** 2 + coefficients.imag ** 2
+    return coefficients ** 2
+
+SCALOGRAM_OUTPUTS = {
+    'magnitude': np.abs,
+    'power': _power,
+}
+
+def _kernel_margins(size):
+    # Input samples needed before and after an output sample for a kernel of this size
+    shift = (size - 2) // 2
+    return size - 1 - shift, shift + 1
+
+def _scale_groups(scales, wavelet, precision):
+    """
+    Split scale indices into groups of similar kernel length, each with the
+    input margins of its longest kernel.
+    """
+    sizes = np.array([_scale_kernel(wavelet, s, precision).size for s in scales])
+    if np.any(sizes < 2):
+        raise ValueError(f"Selected scale of {scales[np.argmin(sizes)]} too small.")
+    order = np.argsort(sizes, kind='stable')
+    groups = []
+    first = 0
+    for i in range(1, len(order) + 1):
+        if i == len(order) or sizes[order[i]] > 2 * sizes[order[first]]:
+            rows = order[first:i]
+            groups.append((rows, _kernel_margins(sizes[rows].max())))
+            first = i
+    return groups
+
+def iter_scalogram(data, scales, wavelet='cmor', output='magnitude', decimate=1,
+                   block_size=CWT_BLOCK_SIZE, axis=-1, dtype=np.float32,
+                   precision=WAVELET_PRECISION, workers=None):
+    """
+    Scalogram of a long signal, computed block by block.
+
+    Each block reads only the input it needs: scales are grouped by kernel
+    length and every group is transformed over the block plus the support of
+    its longest kernel, so blocks join without seams and match
+    compute_wavelet_transform. data may be an np.memmap.
+
+    Parameters:
+        data (np.ndarray): Input signal, e.g. (channels, samples).
+        scales (np.ndarray): Array of scales.
+        wavelet (str): Wavelet name.
+        output (str): 'magnitude' (|W|) or 'power' (|W| ** 2).
+        decimate (int): Keep every decimate-th time sample.
+        block_size (int): Input samples per block.
+        axis (int): Time axis of data.
+        dtype (np.dtype): Compute and output precision.
+        precision (int): Wavelet sampling precision, as in pywt.cwt.
+        workers (int): Threads used by scipy.fft.
+
+    Yields:
+        tuple: (start, block) where block has shape (n_scales,) + data.shape
+        with the time axis holding output samples start, start + 1, ...
+    """
+    if output not in SCALOGRAM_OUTPUTS:
+        raise ValueError(f"output must be one of {sorted(SCALOGRAM_OUTPUTS)}, got {output!r}")
+    scales = np.atleast_1d(scales)
+    if np.any(scales <= 0):
+        raise ValueError("`scales` must only include positive values")
+    reduce = SCALOGRAM_OUTPUTS[output]
+    dtype = np.dtype(dtype)
+    q = int(decimate)
+    block = -(-int(block_size) // q) * q
+    moved = np.moveaxis(data, axis, -1)
+    lead, n = moved.shape[:-1], moved.shape[-1]
+    int_psi, _ = _integrated_wavelet(wavelet, precision)
+    real = not (np.iscomplexobj(int_psi) or np.iscomplexobj(data))
+    groups = _scale_groups(scales, wavelet, precision)
+    time_axis = axis if axis < 0 else axis + 1
+    for a in range(0, n, block):
+        b = min(n, a + block)
+        out = np.empty((len(scales),) + lead + (-(-(b - a) // q),), dtype=dtype)
+        for rows, (left, right) in groups:
+            # Fixed-length, zero-padded segment so the cached responses are reused
+            segment = np.zeros(lead + (block + left + right,), dtype=dtype if real else
+                               np.result_type(dtype, moved.dtype))
+            lo, hi = max(0, a - left), min(n, a + block + right)
+            segment[..., lo - (a - left):hi - (a - left)] = moved[..., lo:hi]
+            _fft_cwt(segment, scales[rows], wavelet, real, dtype, precision, workers, out,
+                     rows=rows, start=left, step=q, reduce=reduce)
+        yield a // q, np.moveaxis(out, -1, time_axis)
+
+def wavelet_scalogram(data, scales, wavelet='cmor', sampling_period=1.0, output='magnitude',
+                      decimate=1, path=None, out=None, axis=-1, dtype=np.float32, **kwargs):
+    """
+    Out-of-core scalogram, written block by block (see iter_scalogram).
+
+    Only one block of coefficients is in memory at a time, so a memmap
+    output can hold scalograms far larger than RAM.
+
+    Parameters:
+        data (np.ndarray): Input signal, e.g. (channels, samples).
+        scales (np.ndarray): Array of scales.
+        wavelet (str): Wavelet name.
+        sampling_period (float): Sampling period.
+        output (str): 'magnitude' or 'power'.
+        decimate (int): Keep every decimate-th time sample.
+        path (str): Write to this file; '.npy' paths get an .npy header.
+        out (np.ndarray): Preallocated output, used when no path is given.
+        axis (int): Time axis of data.
+        dtype (np.dtype): Output precision.
+        **kwargs: block_size, precision or workers for iter_scalogram.
+
     Returns:
-        tuple: (coefficients, frequencies)
+        tuple: (scalogram, frequencies); the scalogram has shape
+        (n_scales,) + data.shape with the time axis reduced by decimate.
+    """
+    scales = np.atleast_1d(scales)
+    shape = list(np.shape(data))
+    shape[axis] = -(-shape[axis] // int(decimate))
+    shape = (len(scales),) + tuple(shape)
+    if path is not None:
+        if str(path).endswith('.npy'):
+            out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+        else:
+            out = np.memmap(path, mode='w+', dtype=dtype, shape=shape)
+    elif out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    time_axis = axis if axis < 0 else axis + 1
+    target = np.moveaxis(out, time_axis, -1)
+    for start, block in iter_scalogram(data, scales, wavelet, output=output, decimate=decimate,
+                                       axis=axis, dtype=dtype, **kwargs):
+        block = np.moveaxis(block, time_axis, -1)
+        target[..., start:start + block.shape[-1]] = block
+    if isinstance(out, np.memmap):
+        out.flush()
+    frequencies = np.atleast_1d(pywt.scale2frequency(wavelet, scales,
+                                                     kwargs.get('precision', WAVELET_PRECISION)))
+    return out, frequencies / sampling_period
+
+class BandScalogram:
+    """
+    Log-spaced scalogram in which every scale has its own time resolution.
+
+    values[i] holds scale i sampled every factors[i] input samples, with the
+    time axis where data had it; sample k lies at k * factors[i] / fs
+    seconds (see times). dense() interpolates all scales back onto the input
+    sample grid.
+    """
+
+    def __init__(self, frequencies, scales, factors, values, fs, n_samples, axis):
+        self.frequencies = frequencies
+        self.scales = scales
+        self.factors = factors
+        self.values = values
+        self.fs = fs
+        self.n_samples = n_samples
+        self.axis = axis
+
+    def __len__(self):
+        return len(self.values)
+
+    def times(self, i):
+        """
+        Sample times in seconds of scale i.
+        """
+        return np.arange(self.values[i].shape[self.axis]) * self.factors[i] / self.fs
+
+    def dense(self):
+        """
+        Linear interpolation of every scale onto the input sample grid.
+
+        Returns:
+            np.ndarray: (n_scales,) + data.shape array.
+        """
+        n = self.n_samples
+        first = np.moveaxis(self.values[0], self.axis, -1)
+        out = np.empty((len(self),) + first.shape[:-1] + (n,), dtype=first.dtype)
+        t = np.arange(n)
+        for band_out, values, q in zip(out, self.values, self.factors):
+            values = np.moveaxis(values, self.axis, -1)
+            index = np.minimum(t // q, values.shape[-1] - 1)
+            following = np.minimum(index + 1, values.shape[-1] - 1)
+            fraction = ((t - index * q) / q).astype(out.dtype)
+            band_out[...] = values[..., index] * (1 - fraction) + values[..., following] * fraction
+        return np.moveaxis(out, -1, self.axis if self.axis < 0 else self.axis + 1)
+
+def _band_range(bands):
+    edges = np.asarray(list(bands.values()) if isinstance(bands, dict) else bands, dtype=float)
+    return edges.min(), edges.max()
+
+def band_scalogram(data, fs, fmin=None, fmax=None, voices_per_octave=VOICES_PER_OCTAVE,
+                   wavelet=SCALOGRAM_WAVELET, output='magnitude', axis=-1, dtype=np.float32,
+                   margin=SCALOGRAM_RATE_MARGIN, precision=WAVELET_PRECISION, workers=None):
+    """
+    Scalogram on log-spaced frequencies, each scale decimated to its bandwidth.
+
+    Frequencies run from fmax down to fmin with voices_per_octave steps per
+    octave. Scale i is kept every factors[i] samples, the largest power of
+    two leaving a rate of at least margin times its frequency. Decimation is
+    done in the frequency domain: the product spectrum is folded to
+    nfft / factor bins, so each scale needs only a short inverse FFT, and
+    the kept samples equal those of compute_wavelet_transform.
+
+    Parameters:
+        data (np.ndarray): Input signal, e.g. (channels, samples).
+        fs (float): Sampling frequency.
+        fmin (float): Lowest frequency (default: lowest BANDS edge).
+        fmax (float): Highest frequency (default: highest BANDS edge).
+        voices_per_octave (int): Scales per octave.
+        wavelet (str): Wavelet name.
+        output (str): 'magnitude', 'power' or 'complex'.
+        axis (int): Time axis of data.
+        dtype (np.dtype): Compute and output precision.
+        margin (float): Minimum output rate as a multiple of the frequency.
+        precision (int): Wavelet sampling precision, as in pywt.cwt.
+        workers (int): Threads used by scipy.fft.
+
+    Returns:
+        BandScalogram: Frequencies (descending), scales, decimation factors
+        and per-scale values.
+    """
+    low, high = _band_range(BANDS)
+    fmin = low if fmin is None else fmin
+    fmax = high if fmax is None else fmax
+    if not 0 < fmin <= fmax < fs / 2:
+        raise ValueError(f"need 0 < fmin <= fmax < fs / 2, got fmin={fmin}, fmax={fmax}")
+    if output != 'complex' and output not in SCALOGRAM_OUTPUTS:
+        raise ValueError(f"output must be 'complex' or one of {sorted(SCALOGRAM_OUTPUTS)}, "
+                         f"got {output!r}")
+    n_steps = int(np.floor(voices_per_octave * np.log2(fmax / fmin) + 1e-9))
+    frequencies = fmax * 2.0 ** (-np.arange(n_steps + 1) / voices_per_octave)
+    scales = np.atleast_1d(pywt.frequency2scale(wavelet, frequencies / fs, precision))
+    factors = 2 ** np.floor(np.log2(np.maximum(fs / (margin * frequencies), 1))).astype(int)
+
+    dtype = np.dtype(dtype)
+    data = np.asarray(data, dtype=dtype)
+    moved = np.moveaxis(data, axis, -1)
+    lead, n = moved.shape[:-1], moved.shape[-1]
+    int_psi, _ = _integrated_wavelet(wavelet, precision)
+    complex_dtype = np.result_type(dtype, np.complex64)
+    # The FFT size must split into factor-sized folds for every scale
+    q_max = factors.max()
+    longest = _scale_kernel(wavelet, scales.max(), precision).size
+    nfft = q_max * next_fast_len(-(-(n + longest - 1) // q_max))
+    spectrum = fft(moved, nfft, workers=workers)
+    # Responses span the whole signal, so they are built for this call only
+    roots = _roots(nfft)
+
+    values = [None] * len(scales)
+    for q in np.unique(factors):
+        rows = np.flatnonzero(factors == q)
+        m = nfft // q
+        group = max(1, FFT_MAX_ELEMENTS // (nfft * max(1, int(np.prod(lead)))))
+        for first in range(0, len(rows), group):
+            batch = rows[first:first + group]
+            responses = np.stack([_scale_response(wavelet, scales[j], nfft, False, dtype,
+                                                  precision, roots) for j in batch])
+            responses = responses.reshape((len(batch),) + (1,) * len(lead) + (-1,))
+            product = spectrum * responses
+            # Sampling every q-th output sample aliases the spectrum onto nfft / q bins
+            folded = product.reshape(product.shape[:-1] + (q, m)).sum(axis=-2)
+            coefficients = ifft(folded, m, overwrite_x=True, workers=workers)[..., :-(-n // q)]
+            coefficients /= q
+            if not np.iscomplexobj(int_psi):
+                coefficients = coefficients.real
+            if output != 'complex':
+                coefficients = SCALOGRAM_OUTPUTS[output](coefficients)
+            for j, c in zip(batch, coefficients):
+                values[j] = np.moveaxis(c.astype(dtype if output != 'complex' else
+                                                 c.dtype, copy=False), -1, axis)
+    return BandScalogram(frequencies, scales, factors, values, fs, n, axis)
+
+def wavelet_cache_info():
+    """
+    Return hit/miss statistics of the wavelet response cache.
+    """
+    return _wavelet_cache.info()
+
+def clear_wavelet_cache():
+    """
+    Drop all cached wavelet responses and reset the statistics.
     """
-    coefficients, frequencies = pywt.cwt(data, scales, wavelet, sampling_period=sampling_period)
-    return coefficients, frequencies
+    _wavelet_cache.clear()
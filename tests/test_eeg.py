@@ -1,5 +1,7 @@
 import unittest
-from signal_processing.eeg import simulate_eeg
+import numpy as np
+from signal_processing.config import BANDS
+from signal_processing.eeg import simulate_eeg, band_power, band_powers
 
 class TestSimulateEEG(unittest.TestCase):
     def test_signal_length(self):
@@ -9,5 +11,20 @@ class TestSimulateEEG(unittest.TestCase):
         self.assertEqual(len(t), fs * duration)
         self.assertEqual(len(eeg), fs * duration)
 
+class TestBandPowers(unittest.TestCase):
+    def test_matches_band_power(self):
+        fs = 250
+        eeg = np.stack([simulate_eeg(fs, 4)[1] for _ in range(3)])
+        powers = band_powers(eeg, fs, BANDS)
+        self.assertEqual(powers.shape, (3, len(BANDS)))
+        for ch in range(3):
+            for i, band in enumerate(BANDS.values()):
+                self.assertAlmostEqual(powers[ch, i], band_power(eeg[ch], fs, band))
+
+    def test_time_axis(self):
+        fs = 250
+        eeg = np.random.randn(fs * 4, 2)
+        np.testing.assert_allclose(band_powers(eeg, fs, axis=0), band_powers(eeg.T, fs))
+
 if __name__ == "__main__":
     unittest.main()
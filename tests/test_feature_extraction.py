@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from scipy.signal import hilbert
+from signal_processing.feature_extraction import (amplitude_envelope_correlation,
+                                                  amplitude_envelopes, envelope_correlation,
+                                                  envelope_correlation_matrix)
+
+class TestEnvelopeCorrelationMatrix(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.n = 2003  # prime length
+        self.envelopes = 1 + np.abs(np.sin(np.arange(self.n)[None, :] / [[50.0], [80.0]]))
+        carrier = np.sin(2 * np.pi * np.arange(self.n) / 10)
+        self.eeg = np.concatenate((self.envelopes * carrier,
+                                   rng.standard_normal((3, self.n))))
+
+    def test_envelopes_close_to_unpadded_hilbert(self):
+        expected = np.abs(hilbert(self.eeg, axis=-1))
+        envelopes = amplitude_envelopes(self.eeg)
+        self.assertEqual(envelopes.shape, self.eeg.shape)
+        np.testing.assert_allclose(envelopes[:2, 100:-100], expected[:2, 100:-100], atol=0.05)
+        np.testing.assert_allclose(amplitude_envelopes(self.eeg.T, axis=0), envelopes.T)
+
+    def test_matches_envelope_correlation(self):
+        matrix = envelope_correlation_matrix(self.eeg, self.envelopes)
+        self.assertEqual(matrix.shape, (5, 2))
+        expected = [[envelope_correlation(channel, env) for env in self.envelopes]
+                    for channel in self.eeg]
+        np.testing.assert_allclose(matrix, expected, atol=0.01)
+        self.assertGreater(matrix[0, 0], 0.95)
+        single = envelope_correlation_matrix(self.eeg.T, self.envelopes[1], axis=0)
+        np.testing.assert_allclose(single[:, 0], matrix[:, 1])
+
+    def test_aec_matrix(self):
+        aec = amplitude_envelope_correlation(self.eeg)
+        self.assertEqual(aec.shape, (5, 5))
+        np.testing.assert_allclose(aec, aec.T)
+        np.testing.assert_allclose(np.diag(aec), 1.0)
+        np.testing.assert_allclose(aec, np.corrcoef(amplitude_envelopes(self.eeg)), atol=1e-12)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+from scipy.signal import butter, firwin, lfilter
+from signal_processing.design import (butter_design, butter_sos, clear_design_cache,
+                                      design_cache_info, set_design_cache_size)
+from signal_processing.config import BANDS
+from signal_processing.filters import (bandpass_filter, decimation_factor, decompose_bands,
+                                       fir_filter, multirate_bandpass)
+
+class TestDesignCache(unittest.TestCase):
+    def setUp(self):
+        clear_design_cache()
+
+    def tearDown(self):
+        set_design_cache_size(256)
+
+    def test_hits_and_misses(self):
+        x = np.random.randn(500)
+        y1 = bandpass_filter(x, 8, 13, 250)
+        y2 = bandpass_filter(x, 8, 13, 250)
+        np.testing.assert_array_equal(y1, y2)
+        info = design_cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 1, 1))
+
+    def test_matches_uncached_design(self):
+        x = np.random.randn(500)
+        b, a = butter(4, [8 / 125, 13 / 125], btype='band')
+        np.testing.assert_allclose(bandpass_filter(x, 8, 13, 250), lfilter(b, a, x))
+        taps = firwin(101, [8 / 125, 13 / 125], pass_zero=False)
+        np.testing.assert_allclose(fir_filter(x, 8, 13, 250), lfilter(taps, 1.0, x))
+
+    def test_resize_evicts_and_designs_are_read_only(self):
+        for order in range(1, 5):
+            butter_design(order, 0.1, btype='low')
+        set_design_cache_size(2)
+        self.assertEqual(design_cache_info().currsize, 2)
+        b, a = butter_design(4, 0.1, btype='low')
+        self.assertFalse(b.flags.writeable)
+
+class TestSosFiltering(unittest.TestCase):
+    def test_sos_matches_ba_at_low_order(self):
+        x = np.random.randn(2, 3, 1000)
+        np.testing.assert_allclose(bandpass_filter(x, 8, 13, 250, output='sos'),
+                                   bandpass_filter(x, 8, 13, 250), atol=1e-7)
+
+    def test_axis_matches_per_channel_loop(self):
+        x = np.random.randn(1000, 4)
+        y = bandpass_filter(x, 0.5, 4, 1000, order=8, output='sos', axis=0)
+        for ch in range(4):
+            np.testing.assert_allclose(y[:, ch], bandpass_filter(x[:, ch], 0.5, 4, 1000, order=8,
+                                                                 output='sos'))
+
+    def test_high_order_narrow_band_is_stable(self):
+        x = np.random.randn(20000)
+        y = bandpass_filter(x, 0.5, 4, 1000, order=8, output='sos')
+        self.assertTrue(np.all(np.isfinite(y)))
+        self.assertLess(np.std(y), np.std(x))
+
+    def test_invalid_output(self):
+        with self.assertRaises(ValueError):
+            bandpass_filter(np.zeros(10), 8, 13, 250, output='zpk')
+
+    def test_butter_sos_is_a_writable_copy(self):
+        sos = butter_sos(4, [0.1, 0.2])
+        self.assertTrue(sos.flags.writeable)
+        sos[0, 0] = 0.0
+        cached = butter_design(4, [0.1, 0.2], output='sos')
+        self.assertFalse(cached.flags.writeable)
+        np.testing.assert_array_equal(butter_sos(4, [0.1, 0.2]), cached)
+
+class TestFftFir(unittest.TestCase):
+    def test_fft_matches_direct(self):
+        for shape, numtaps in [((3, 5000), 1001), ((2, 40), 301), ((700,), 129)]:
+            x = np.random.randn(*shape)
+            np.testing.assert_allclose(fir_filter(x, 8, 13, 250, numtaps=numtaps, method='fft'),
+                                       fir_filter(x, 8, 13, 250, numtaps=numtaps, method='direct'),
+                                       atol=1e-10)
+
+    def test_block_groups_carry_tail(self):
+        from signal_processing import filters
+        x = np.random.randn(2, 20000)
+        expected = fir_filter(x, 8, 13, 250, numtaps=257, method='direct')
+        with patch.object(filters, 'FFT_MAX_ELEMENTS', 1):
+            y = fir_filter(x, 8, 13, 250, numtaps=257, method='fft')
+        np.testing.assert_allclose(y, expected, atol=1e-10)
+
+    def test_axis(self):
+        x = np.random.randn(3000, 2)
+        np.testing.assert_allclose(fir_filter(x, 8, 13, 250, numtaps=501, method='fft', axis=0),
+                                   fir_filter(x.T, 8, 13, 250, numtaps=501, method='direct').T,
+                                   atol=1e-10)
+
+class TestFilterBank(unittest.TestCase):
+    def test_matches_bandpass_filter(self):
+        x = np.random.randn(3, 1000)
+        bands = decompose_bands(x, 250)
+        self.assertEqual(bands.shape, (len(BANDS), 3, 1000))
+        for band_out, (low, high) in zip(bands, BANDS.values()):
+            np.testing.assert_allclose(band_out, bandpass_filter(x, low, high, 250, output='sos'))
+
+    def test_axis_and_out(self):
+        x = np.random.randn(1000, 3)
+        out = np.empty((len(BANDS), 1000, 3))
+        result = decompose_bands(x, 250, axis=0, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(out.transpose(0, 2, 1), decompose_bands(x.T, 250))
+        with self.assertRaises(ValueError):
+            decompose_bands(x, 250, out=np.empty((2, 1000, 3)))
+
+class TestMultirate(unittest.TestCase):
+    def test_decimation_factor(self):
+        self.assertEqual(decimation_factor(4, 1000), 50)
+        self.assertEqual(decimation_factor(100, 250), 1)
+
+    def test_comparable_to_bandpass_filter(self):
+        fs = 1000
+        x = np.random.randn(2, 60 * fs)
+        y, fs_out = multirate_bandpass(x, 0.5, 4, fs)
+        self.assertEqual((y.shape, fs_out), (x.shape, fs))
+        ref = bandpass_filter(x, 0.5, 4, fs, output='sos')
+        steady = slice(5 * fs, -5 * fs)
+        for ch in range(2):
+            self.assertGreater(np.corrcoef(y[ch, steady], ref[ch, steady])[0, 1], 0.95)
+
+    def test_low_rate_output(self):
+        y, fs_out = multirate_bandpass(np.random.randn(1000), 4, 8, 1000, resample_back=False)
+        self.assertEqual((len(y), fs_out), (40, 40.0))
+
+    def test_multirate_bank(self):
+        fs = 1000
+        x = np.random.randn(20 * fs)
+        bands = decompose_bands(x, fs, bands=[(0.5, 4), (30, 100)], multirate=True)
+        ref = decompose_bands(x, fs, bands=[(0.5, 4), (30, 100)])
+        steady = slice(5 * fs, -5 * fs)
+        for band, expected in zip(bands, ref):
+            self.assertGreater(np.corrcoef(band[steady], expected[steady])[0, 1], 0.95)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+from signal_processing.gm_phd import GmPhdFilter
+from signal_processing.phd_filter import simulate_measurement_sequence
+
+class TestGmPhdFilter(unittest.TestCase):
+    def test_tracks_static_targets(self):
+        values, offsets = simulate_measurement_sequence([30.0, 70.0], n_steps=60, clutter_rate=2,
+                                                        rng=2)
+        filt = GmPhdFilter(clutter_rate=2, process_noise=0.1)
+        cardinality, located = [], 0
+        for i in range(60):
+            filt.step(values[offsets[i]:offsets[i + 1]])
+            if i >= 30:
+                cardinality.append(filt.cardinality)
+                heaviest = np.sort(filt.means[np.argsort(filt.weights)[-2:]].ravel())
+                located += np.all(np.abs(heaviest - [30.0, 70.0]) < 3)
+        self.assertAlmostEqual(np.mean(cardinality), 2.0, delta=0.3)
+        self.assertGreater(located, 25)
+        self.assertLessEqual(len(filt.weights), filt.max_components)
+
+    def test_empty_scan_keeps_missed_detections(self):
+        filt = GmPhdFilter()
+        filt.step([40.0])
+        weights = filt.weights.copy()
+        filt.step([])
+        self.assertEqual(filt.means.shape[1], 1)
+        expected = (1 - filt.detection_prob) * (filt.survival_prob * weights.sum()
+                                                + filt.birth_weights.sum())
+        self.assertAlmostEqual(filt.cardinality, expected, delta=1e-4)
+
+    def test_prune_and_merge(self):
+        filt = GmPhdFilter(max_components=2)
+        filt.weights = np.array([0.5, 0.3, 1e-9, 0.2, 0.1])
+        filt.means = np.array([[10.0], [10.5], [50.0], [80.0], [40.0]])
+        filt.covs = np.ones((5, 1, 1))
+        filt.prune()
+        np.testing.assert_allclose(filt.weights, [0.8, 0.2])
+        np.testing.assert_allclose(filt.means.ravel(), [(5.0 + 3.15) / 0.8, 80.0])
+        np.testing.assert_allclose(filt.covs.ravel(), [1 + (0.5 * 0.1875 ** 2 + 0.3 * 0.3125 ** 2) / 0.8, 1.0])
+
+    def test_two_dimensional_model(self):
+        dt = 1.0
+        filt = GmPhdFilter(transition=[[1, dt], [0, 1]], process_noise=np.diag([0.01, 0.01]),
+                           measurement_matrix=[[1, 0]], clutter_rate=1,
+                           birth_covs=np.diag([100.0, 4.0])[None], birth_means=[[50.0, 0.0]],
+                           birth_weights=[0.2])
+        for k in range(30):
+            filt.step([[20.0 + 1.0 * k]])
+        best = filt.means[np.argmax(filt.weights)]
+        np.testing.assert_allclose(best, [49.0, 1.0], atol=1.0)
+
+    def test_partial_birth_model(self):
+        with self.assertRaises(ValueError):
+            GmPhdFilter(birth_means=[[10.0]])
+        with self.assertRaises(ValueError):
+            GmPhdFilter(birth_means=[[10.0]], birth_covs=[[[4.0]]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from signal_processing.phd_ensemble import BatchPhdFilter, pack_measurements, run_monte_carlo
+
+class TestPackMeasurements(unittest.TestCase):
+    def test_offsets(self):
+        values, offsets = pack_measurements([[1.0, 2.0], [], [3.0]])
+        np.testing.assert_array_equal(values, [1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(offsets, [0, 2, 2, 3])
+
+class TestBatchPhdFilter(unittest.TestCase):
+    def test_rows_are_independent(self):
+        bank = BatchPhdFilter(3, num_particles=400, rng=0)
+        for _ in range(15):
+            particles, weights = bank.step(*pack_measurements([[20.0], [], [80.0]]))
+        self.assertEqual(particles.shape, (3, 400))
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        self.assertGreater(np.mean(np.abs(particles[0] - 20.0) < 3), 0.5)
+        self.assertGreater(np.mean(np.abs(particles[2] - 80.0) < 3), 0.5)
+        self.assertLess(np.mean(np.abs(particles[1] - 20.0) < 3), 0.5)
+
+    def test_offsets_must_match_batch(self):
+        bank = BatchPhdFilter(2, num_particles=10, rng=0)
+        with self.assertRaises(ValueError):
+            bank.step(np.zeros(1), [0, 1])
+
+class TestRunMonteCarlo(unittest.TestCase):
+    def test_mass_tracks_target_count(self):
+        for targets in ([], [30.0, 70.0], [20.0, 50.0, 80.0]):
+            positions = np.full((30, max(1, len(targets))), np.nan)
+            positions[:, :len(targets)] = targets
+            _, mass = run_monte_carlo(8, 30, positions, seed=3, num_particles=300)
+            self.assertLess(abs(mass[:, -10:].mean() - len(targets)), 0.6)
+
+    def test_independent_of_worker_count(self):
+        kwargs = dict(n_scenarios=5, n_steps=4, true_positions=[30.0, 70.0], seed=7,
+                      shard_size=2, num_particles=100)
+        particles, mass = run_monte_carlo(n_workers=1, **kwargs)
+        self.assertEqual((particles.shape, mass.shape), ((5, 100), (5, 4)))
+        particles2, mass2 = run_monte_carlo(n_workers=2, **kwargs)
+        np.testing.assert_array_equal(particles, particles2)
+        np.testing.assert_array_equal(mass, mass2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,300 @@
+import importlib
+import tracemalloc
+import unittest
+from unittest.mock import patch
+import numpy as np
+from signal_processing.phd_filter import (DETECTION_PROB, NUM_PARTICLES, RESAMPLERS, PhdFilter,
+                                          clutter_density, effective_sample_size,
+                                          extract_targets, measurement_update, phd_filter,
+                                          simulate_measurement_sequence)
+
+def _reference_update(particles, weights, measurements, kappa):
+    updated = (1 - DETECTION_PROB) * weights
+    for z in measurements:
+        g = DETECTION_PROB * np.exp(-0.5 * (z - particles) ** 2) / np.sqrt(2 * np.pi) * weights
+        updated += g / (kappa + g.sum())
+    return updated
+
+def _gated_update(white, v, weights, filt, gate):
+    module = importlib.import_module('signal_processing.phd_filter')
+    return module._whitened_update(white, v, weights, filt.detection_prob,
+                                   filt.clutter_intensity, filt._scale, gate)
+
+class TestSimulateMeasurementSequence(unittest.TestCase):
+    def test_layout(self):
+        trajectories = np.array([[10.0, np.nan], [20.0, 60.0], [np.nan, np.nan]])
+        values, offsets = simulate_measurement_sequence(trajectories, detection_prob=1.0,
+                                                        clutter_rate=0.0, measurement_std=0.0,
+                                                        rng=0)
+        np.testing.assert_array_equal(offsets, [0, 1, 3, 3])
+        np.testing.assert_array_equal(values, [10.0, 20.0, 60.0])
+
+    def test_statistics(self):
+        values, offsets = simulate_measurement_sequence([30.0, 70.0], n_steps=20000, rng=1)
+        counts = np.diff(offsets)
+        self.assertAlmostEqual(counts.mean(), 2 * DETECTION_PROB + 10, delta=0.1)
+        first = values[offsets[:-1][counts > 0]]
+        self.assertTrue(np.all((values >= -10) & (values <= 110)))
+        self.assertGreater(np.mean(np.abs(first - 30.0) < 4), 0.85)
+
+class TestMeasurementUpdate(unittest.TestCase):
+    def test_matches_per_measurement_loop(self):
+        module = importlib.import_module('signal_processing.phd_filter')
+        particles = np.random.uniform(0, 100, 300)
+        weights = np.full(300, 2.0 / 300)
+        measurements = np.random.uniform(0, 100, 40)
+        expected = _reference_update(particles, weights, measurements, clutter_density())
+        np.testing.assert_allclose(measurement_update(particles, weights, measurements), expected)
+        with patch.object(module, 'MAX_KERNEL_ELEMENTS', 1):
+            np.testing.assert_allclose(measurement_update(particles, weights, measurements),
+                                       expected)
+
+    def test_gated_matches_ungated(self):
+        module = importlib.import_module('signal_processing.phd_filter')
+        particles = np.random.uniform(0, 100, 2000)
+        weights = np.random.random(2000) / 1000
+        measurements = np.concatenate((np.random.uniform(0, 100, 60), [-50.0]))
+        full = measurement_update(particles, weights, measurements)
+        np.testing.assert_allclose(measurement_update(particles, weights, measurements, gate=40),
+                                   full)
+        np.testing.assert_allclose(measurement_update(particles, weights, measurements, gate=8),
+                                   full, rtol=1e-10, atol=1e-14)
+        with patch.object(module, 'MAX_KERNEL_ELEMENTS', 7):
+            np.testing.assert_allclose(
+                measurement_update(particles, weights, measurements, gate=8), full,
+                rtol=1e-10, atol=1e-14)
+
+    def test_detected_target_gains_mass(self):
+        particles = np.concatenate((np.full(50, 40.0), np.random.uniform(0, 100, 450)))
+        weights = np.full(500, 1.0 / 500)
+        updated = measurement_update(particles, weights, [40.0])
+        self.assertGreater(updated[:50].sum(), weights[:50].sum())
+        self.assertLess(updated[50:].sum(), weights[50:].sum())
+
+class TestResampling(unittest.TestCase):
+    def test_counts_follow_weights(self):
+        rng = np.random.default_rng(0)
+        weights = rng.random(1000) ** 4
+        expected = weights / weights.sum() * 5000
+        for name, resample in RESAMPLERS.items():
+            indices = resample(weights, 5000, rng)
+            self.assertEqual(len(indices), 5000)
+            counts = np.bincount(indices, minlength=1000)
+            if name in ('systematic', 'residual'):
+                self.assertTrue(np.all(np.abs(counts - expected) < 1 + 1e-9))
+                self.assertTrue(np.all(np.diff(indices) >= 0))
+            self.assertLess(np.abs(counts - expected).max(), 20)
+
+    def test_stratified_matches_search(self):
+        for seed in range(20):
+            rng = np.random.default_rng(seed)
+            weights = rng.random(300) ** 3
+            indices = RESAMPLERS['stratified'](weights, 450, np.random.default_rng(seed))
+            offsets = np.random.default_rng(seed).random(450)
+            cdf = np.cumsum(weights)
+            positions = (np.arange(450) + offsets) * (cdf[-1] / 450)
+            expected = np.minimum(np.searchsorted(cdf, positions, side='right'), 299)
+            np.testing.assert_array_equal(indices, expected)
+
+    def test_work_buffers_do_not_change_indices(self):
+        weights = np.random.default_rng(1).random(400) ** 3
+        for name, resample in RESAMPLERS.items():
+            plain = resample(weights, 500, np.random.default_rng(2))
+            buffered = resample(weights, 500, np.random.default_rng(2),
+                                cdf=np.empty(400), counts=np.empty(400, dtype=np.intp))
+            np.testing.assert_array_equal(plain, buffered, err_msg=name)
+
+    def test_effective_sample_size(self):
+        self.assertAlmostEqual(effective_sample_size(np.full(10, 3.0)), 10.0)
+        self.assertAlmostEqual(effective_sample_size(np.eye(1, 10)[0]), 1.0)
+
+class TestPhdFilter(unittest.TestCase):
+    def test_cycle_shapes(self):
+        particles = np.random.uniform(0, 100, NUM_PARTICLES)
+        weights = np.full(NUM_PARTICLES, 1.0 / NUM_PARTICLES)
+        particles, weights = phd_filter(particles, weights, [20.0, 70.0, 5.0])
+        self.assertEqual(particles.shape, (NUM_PARTICLES,))
+        self.assertAlmostEqual(weights.sum(), 1.0)
+
+    def test_reproducible_with_generator(self):
+        start = np.random.default_rng(1).uniform(0, 100, NUM_PARTICLES)
+        results = []
+        for _ in range(2):
+            rng = np.random.default_rng(2)
+            results.append(phd_filter(start.copy(), np.full(NUM_PARTICLES, 1.0 / NUM_PARTICLES),
+                                      [30.0], resampler='residual', rng=rng)[0])
+        np.testing.assert_array_equal(*results)
+
+    def test_ess_threshold_skips_resampling(self):
+        module = importlib.import_module('signal_processing.phd_filter')
+        rng = np.random.default_rng(3)
+        particles = rng.uniform(0, 100, NUM_PARTICLES)
+        weights = np.full(NUM_PARTICLES, 1.0 / NUM_PARTICLES)
+        sizes = []
+        for _ in range(20):
+            particles, weights = phd_filter(particles, weights, [30.0, 70.0], ess_threshold=0.0,
+                                            rng=rng)
+            sizes.append(len(particles))
+            self.assertAlmostEqual(weights.sum(), 1.0)
+        # Births accumulate unresampled until the set would exceed MAX_PARTICLES
+        self.assertGreater(sizes[0], NUM_PARTICLES)
+        self.assertLessEqual(max(sizes), module.MAX_PARTICLES)
+        self.assertIn(NUM_PARTICLES, sizes)
+        self.assertGreater(sum(size != NUM_PARTICLES for size in sizes), 10)
+
+    def test_ess_threshold_resamples_degenerate_weights(self):
+        rng = np.random.default_rng(4)
+        particles = rng.uniform(0, 100, NUM_PARTICLES)
+        weights = np.full(NUM_PARTICLES, 1.0 / NUM_PARTICLES)
+        particles, weights = phd_filter(particles, weights, [50.0], ess_threshold=0.99, rng=rng)
+        self.assertEqual(len(particles), NUM_PARTICLES)
+        np.testing.assert_allclose(weights, 1.0 / NUM_PARTICLES)
+
+    def test_unknown_resampler(self):
+        with self.assertRaises(ValueError):
+            phd_filter(np.zeros(5), np.ones(5), [], resampler='bogus')
+
+class TestPhdFilterClass(unittest.TestCase):
+    def test_update_matches_measurement_update(self):
+        filt = PhdFilter(num_particles=300, rng=0)
+        particles = np.random.uniform(0, 100, 300)
+        weights = np.random.random(300)
+        expected = measurement_update(particles, weights, [10.0, 55.0])
+        filt._update(particles[:, None], np.array([[10.0], [55.0]]), weights)
+        np.testing.assert_allclose(weights, expected)
+
+    def test_step_reuses_buffers(self):
+        filt = PhdFilter(num_particles=200, rng=1)
+        buffers = {id(filt._particles), id(filt._spare)}
+        for _ in range(5):
+            particles, weights = filt.step([25.0, 75.0])
+            self.assertEqual(particles.shape, (200,))
+            self.assertIn(id(particles.base), buffers)
+            self.assertAlmostEqual(weights.sum(), 1.0)
+
+    def test_step_allocation_does_not_grow_with_measurements(self):
+        filt = PhdFilter(num_particles=2000, rng=6)
+        measurements = np.linspace(5.0, 95.0, 200)
+        filt.step(measurements)
+        tracemalloc.start()
+        try:
+            filt.step(measurements)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        # Index arrays of size N only; a copied (200, N) kernel block would be 3.2 MB
+        self.assertLess(peak, 40 * 2000 * 8)
+
+    def test_ess_threshold_skips_resampling(self):
+        filt = PhdFilter(num_particles=300, ess_threshold=0.0, rng=2)
+        sizes = []
+        for _ in range(30):
+            particles, weights = filt.step([25.0, 75.0])
+            sizes.append(len(particles))
+            self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertGreater(sum(size > 300 for size in sizes), 15)
+        self.assertIn(300, sizes)
+        self.assertLessEqual(max(sizes) + filt.max_births, filt.capacity)
+        with self.assertRaises(ValueError):
+            PhdFilter(num_particles=300, capacity=300)
+
+    def test_gated_filter_keeps_particles_sorted(self):
+        filt = PhdFilter(num_particles=500, gate=5, rng=7)
+        for _ in range(10):
+            particles, _ = filt.step([30.0, 70.0])
+            self.assertTrue(np.all(np.diff(particles) >= 0))
+
+    def test_reproducible_and_tracks_target(self):
+        runs = []
+        for _ in range(2):
+            filt = PhdFilter(rng=5, gate=5)
+            for _ in range(20):
+                filt.step([40.0])
+            runs.append(filt.particles.copy())
+        np.testing.assert_array_equal(*runs)
+        self.assertGreater(np.mean(np.abs(runs[0] - 40.0) < 3), 0.5)
+
+    def test_multidimensional_likelihood(self):
+        R = np.array([[2.0, 0.5], [0.5, 1.0]])
+        filt = PhdFilter(num_particles=300, state_space=[(0, 100), (0, 100), (-1, 1), (-1, 1)],
+                         transition=np.eye(4), process_noise=np.eye(4),
+                         measurement_matrix=np.eye(2, 4), measurement_noise=R, rng=0)
+        particles = np.random.uniform(0, 100, (300, 4))
+        weights = np.random.random(300)
+        z = np.random.uniform(0, 100, (20, 2))
+        diff = z[:, None, :] - particles[None, :, :2]
+        mahalanobis = np.einsum('mni,ij,mnj->mn', diff, np.linalg.inv(R), diff)
+        g = filt.detection_prob * np.exp(-0.5 * mahalanobis) / (2 * np.pi * np.sqrt(np.linalg.det(R)))
+        g *= weights
+        expected = (1 - filt.detection_prob) * weights
+        expected += (g / (filt.clutter_intensity + g.sum(axis=1))[:, None]).sum(axis=0)
+        white = particles @ filt._whitener
+        v = z @ filt._measurement_whitener
+        for gate in (None, 50.0):
+            filt.gate = gate
+            updated = weights.copy()
+            if gate is None:
+                filt._update(white, v, updated)
+            else:
+                updated = _gated_update(white, v, weights, filt, gate)
+            np.testing.assert_allclose(updated, expected)
+
+    def test_tracks_constant_velocity_target(self):
+        F = np.array([[1.0, 1.0], [0.0, 1.0]])
+        filt = PhdFilter(num_particles=2000, state_space=[(0, 100), (-2, 2)], transition=F,
+                         process_noise=np.diag([0.05, 0.01]), measurement_matrix=[[1.0, 0.0]],
+                         measurement_noise=[[1.0]], clutter_rate=2, gate=5, rng=3)
+        for k in range(25):
+            particles, _ = filt.step([[20.0 + 1.5 * k]])
+        self.assertEqual(particles.shape, (2000, 2))
+        near = np.abs(particles[:, 0] - 56.0) < 3
+        self.assertGreater(near.mean(), 0.5)
+        self.assertAlmostEqual(np.median(particles[near, 1]), 1.5, delta=0.3)
+
+class TestExtraction(unittest.TestCase):
+    def test_extract_targets_finds_clusters(self):
+        rng = np.random.default_rng(0)
+        particles = np.concatenate((rng.normal(20, 1, 600), rng.normal(65, 1, 400),
+                                    rng.uniform(0, 100, 100)))
+        weights = np.ones(len(particles))
+        estimates = extract_targets(particles, weights, 2)
+        np.testing.assert_allclose(estimates, [20.0, 65.0], atol=0.5)
+        self.assertEqual(extract_targets(particles, weights, 0).shape, (0,))
+
+    def test_extract_targets_multidimensional(self):
+        rng = np.random.default_rng(1)
+        centres = np.array([[10.0, 80.0], [50.0, 50.0], [90.0, 20.0]])
+        particles = np.repeat(centres, 300, axis=0) + rng.normal(0, 1, (900, 2))
+        estimates = extract_targets(particles, np.ones(900), 3)
+        self.assertEqual(estimates.shape, (3, 2))
+        order = np.argsort(estimates[:, 0])
+        np.testing.assert_allclose(estimates[order], centres, atol=1.0)
+
+    def test_extract_targets_merges_adjacent_cells(self):
+        # Diagonal and side neighbours on a 2-D grid belong to one peak
+        particles = np.array([[2.5, 2.5], [3.5, 3.5], [2.5, 3.5], [0.5, 0.5], [9.5, 9.5]])
+        weights = np.array([1.0, 1.0, 0.5, 0.1, 0.1])
+        estimates = extract_targets(particles, weights, 5, bin_width=1.0)
+        np.testing.assert_allclose(estimates, [[2.9, 3.1], [0.5, 0.5], [9.5, 9.5]])
+
+    def test_phd_filter_returns_cardinality(self):
+        particles = np.random.uniform(0, 100, NUM_PARTICLES)
+        weights = np.full(NUM_PARTICLES, 2.0 / NUM_PARTICLES)
+        particles, weights, cardinality = phd_filter(particles, weights, [20.0, 70.0],
+                                                     return_cardinality=True)
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertGreater(cardinality, 0)
+
+    def test_filter_estimates_cardinality_and_states(self):
+        filt = PhdFilter(num_particles=2000, gate=5, rng=4)
+        measurements = simulate_measurement_sequence(np.tile([30.0, 70.0], (40, 1)), rng=4)
+        values, offsets = measurements
+        cardinality = []
+        for i in range(40):
+            filt.step(values[offsets[i]:offsets[i + 1]])
+            cardinality.append(filt.cardinality)
+        self.assertAlmostEqual(np.mean(cardinality[10:]), 2.0, delta=1.0)
+        np.testing.assert_allclose(np.sort(filt.extract(2)), [30.0, 70.0], atol=2.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+from scipy.signal import welch
+from signal_processing.config import BANDS
+from signal_processing.eeg import band_power, band_powers, simulate_eeg
+from signal_processing.feature_extraction import spectral_entropy
+from signal_processing import spectral
+from signal_processing.spectral import OnlineWelch, band_power_timeseries
+
+class TestOnlineWelch(unittest.TestCase):
+    def test_matches_welch(self):
+        fs = 250
+        x = np.stack([simulate_eeg(fs, 20)[1] for _ in range(2)])
+        acc = OnlineWelch(fs)
+        for start in range(0, x.shape[-1], 37):
+            acc.update(x[:, start:start + 37])
+        freqs, psd = welch(x, fs, nperseg=fs * 2)
+        np.testing.assert_allclose(acc.freqs, freqs)
+        np.testing.assert_allclose(acc.psd, psd)
+        np.testing.assert_allclose(acc.band_powers(BANDS), band_powers(x, fs, BANDS))
+        self.assertAlmostEqual(acc.spectral_entropy()[0], spectral_entropy(x[0], fs))
+
+    def test_forgetting_tracks_recent_segments(self):
+        fs = 100
+        t = np.arange(60 * fs) / fs
+        acc = OnlineWelch(fs, forgetting=0.5)
+        acc.update(np.sin(2 * np.pi * 5 * t))
+        acc.update(np.sin(2 * np.pi * 20 * t))
+        self.assertGreater(acc.band_power((18, 22)), 100 * acc.band_power((3, 7)))
+
+    def test_memory_is_bounded(self):
+        acc = OnlineWelch(100)
+        with self.assertRaises(ValueError):
+            acc.band_powers()
+        for _ in range(50):
+            acc.update(np.random.randn(3, 1000))
+        self.assertLess(acc._buffer.shape[-1], acc.nperseg)
+
+class TestBandPowerTimeseries(unittest.TestCase):
+    def test_matches_band_power_per_window(self):
+        fs = 200
+        x = np.random.randn(2, 10 * fs)
+        powers = band_power_timeseries(x, fs, BANDS, win=2.0, hop=0.25)
+        self.assertEqual(powers.shape, (2, 33, len(BANDS)))
+        for ch in range(2):
+            for i in (0, 7, 32):
+                segment = x[ch, i * fs // 4:i * fs // 4 + 2 * fs]
+                for j, band in enumerate(BANDS.values()):
+                    self.assertAlmostEqual(powers[ch, i, j], band_power(segment, fs, band))
+
+    def test_batches_and_axis(self):
+        fs = 100
+        x = np.random.randn(30 * fs, 3)
+        expected = band_power_timeseries(x.T, fs)
+        with patch.object(spectral, 'MAX_FRAME_ELEMENTS', 1):
+            np.testing.assert_allclose(band_power_timeseries(x, fs, axis=0), expected)
+
+    def test_shorter_than_window(self):
+        powers = band_power_timeseries(np.random.randn(3, 150), 100, win=2.0)
+        self.assertEqual(powers.shape, (3, 0, len(BANDS)))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import numpy as np
+from signal_processing.eeg import highpass_filter
+from signal_processing.filters import bandpass_filter, fir_filter
+from signal_processing.streaming import StreamingBandpass, StreamingHighpass, StreamingFIR
+
+def _stream(filt, x, chunk):
+    return np.concatenate([filt.process(x[..., i:i + chunk]) for i in range(0, x.shape[-1], chunk)],
+                          axis=-1)
+
+class TestStreamingFilters(unittest.TestCase):
+    def test_matches_one_shot(self):
+        fs = 250
+        x = np.random.randn(4, 1000)
+        cases = [
+            (StreamingBandpass(8, 13, fs), lambda d: bandpass_filter(d, 8, 13, fs)),
+            (StreamingHighpass(0.5, fs), lambda d: highpass_filter(d, 0.5, fs)),
+            (StreamingFIR(8, 13, fs), lambda d: fir_filter(d, 8, 13, fs)),
+            (StreamingBandpass(0.5, 4, fs, order=6, output='sos'),
+             lambda d: bandpass_filter(d, 0.5, 4, fs, order=6, output='sos')),
+            (StreamingHighpass(0.5, fs, output='sos'),
+             lambda d: highpass_filter(d, 0.5, fs, output='sos')),
+        ]
+        for filt, one_shot in cases:
+            np.testing.assert_allclose(_stream(filt, x, 10), one_shot(x), atol=1e-12)
+
+    def test_channel_mismatch(self):
+        filt = StreamingBandpass(8, 13, 250)
+        filt.process(np.zeros((4, 10)))
+        with self.assertRaises(ValueError):
+            filt.process(np.zeros((3, 10)))
+        filt.reset()
+        filt.process(np.zeros((3, 10)))
+
+if __name__ == "__main__":
+    unittest.main()
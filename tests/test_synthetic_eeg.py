@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+import tempfile
+import unittest
+import numpy as np
+from scipy.signal import welch
+from signal_processing.synthetic_eeg import EegStream, SyntheticEeg, generate_eeg_file
+
+class TestSyntheticEeg(unittest.TestCase):
+    def test_chunking_and_threads_do_not_change_output(self):
+        whole = SyntheticEeg(6, seed=1).generate(1000)
+        source = SyntheticEeg(6, seed=1)
+        chunks = [source.generate(n, n_workers=w) for n, w in ((137, 1), (500, 3), (363, 2))]
+        self.assertEqual(whole.dtype, np.float32)
+        np.testing.assert_allclose(np.concatenate(chunks, axis=1), whole, atol=1e-5)
+
+    def test_phase_continuity(self):
+        fs = 250
+        source = SyntheticEeg(3, fs, noise_std=0.0, seed=2, dtype=np.float64)
+        first, second = source.generate(333), source.generate(250)
+        t = np.arange(583) / fs
+        # Refit the reference sines from the first chunk and extend them
+        basis = np.concatenate([[np.cos(2 * np.pi * f * t), np.sin(2 * np.pi * f * t)]
+                                for f in source.frequencies]).T
+        coef = np.linalg.lstsq(basis[:333], first.T, rcond=None)[0]
+        np.testing.assert_allclose(second, (basis[333:] @ coef).T, atol=1e-8)
+
+    def test_channels_differ_and_keep_band_peaks(self):
+        fs = 250
+        data = SyntheticEeg(4, fs, seed=3).generate(fs * 20)
+        self.assertFalse(np.allclose(data[0], data[1]))
+        freqs, psd = welch(data, fs, nperseg=fs * 2)
+        for f in (2, 6, 10, 20, 40):
+            self.assertTrue(np.all(psd[:, freqs == f] > 100 * np.median(psd, axis=1)[:, None]))
+
+    def test_reset_restarts(self):
+        source = SyntheticEeg(2, seed=4)
+        first = source.generate(100)
+        source.generate(50)
+        source.reset()
+        np.testing.assert_array_equal(source.generate(100), first)
+
+class TestGenerateEegFile(unittest.TestCase):
+    def test_npy_matches_in_memory(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'eeg.npy')
+            written = generate_eeg_file(path, 8, 3.0, fs=250, chunk_duration=0.7, seed=5,
+                                        n_workers=2)
+            self.assertEqual(written.shape, (8, 750))
+            del written
+            data = np.load(path, mmap_mode='r')
+            self.assertEqual(data.dtype, np.float32)
+            expected = SyntheticEeg(8, 250, seed=5).generate(750)
+            np.testing.assert_allclose(data, expected, atol=1e-5)
+            del data
+
+class TestEegStream(unittest.TestCase):
+    def test_blocks_continue_the_signal(self):
+        stream = EegStream(3, 250, chunk_size=40, speed=None, max_chunks=5, seed=6)
+        blocks = list(stream)
+        self.assertEqual(len(blocks), 5)
+        self.assertEqual(blocks[0].shape, (3, 40))
+        reference = SyntheticEeg(3, 250, seed=np.random.SeedSequence(6).spawn(2)[0]).generate(200)
+        np.testing.assert_allclose(np.concatenate(blocks, axis=1), reference, atol=1e-5)
+
+    def test_real_time_pacing(self):
+        stream = EegStream(2, 1000, chunk_size=50, speed=1.0, max_chunks=4, seed=7)
+        start = time.monotonic()
+        for _ in stream:
+            pass
+        # Four blocks of 50 ms; the first is released immediately
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_async_iteration(self):
+        async def collect():
+            return [block async for block in EegStream(2, 250, chunk_size=25, speed=None,
+                                                       max_chunks=3, seed=8)]
+        self.assertEqual(len(asyncio.run(collect())), 3)
+
+    def test_drift_and_artifacts(self):
+        def run(**kwargs):
+            stream = EegStream(4, 250, chunk_size=250, speed=None, max_chunks=20, seed=9,
+                               noise_std=0.0, **kwargs)
+            return np.concatenate(list(stream), axis=1)
+        clean = run()
+        drift = run(drift_std=5.0) - clean
+        self.assertGreater(np.abs(drift[:, -1]).max(), 1.0)
+        self.assertLess(np.abs(np.diff(drift, axis=1)).max(), 1.0)
+        artifacts = run(artifact_rate=1.0, artifact_amplitude=20.0) - clean
+        self.assertGreater(np.abs(artifacts).max(), 10.0)
+        self.assertLessEqual(np.abs(artifacts).max(), 20.0 * 4)
+
+if __name__ == "__main__":
+    unittest.main()
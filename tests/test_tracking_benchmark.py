@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from signal_processing.tracking_benchmark import (SCENARIOS, benchmark, ospa_distance,
+                                                  pareto_frontier, run_scenario)
+
+class TestOspa(unittest.TestCase):
+    def test_known_values(self):
+        self.assertEqual(ospa_distance([], []), 0.0)
+        self.assertEqual(ospa_distance([], [5.0], cutoff=10), 10.0)
+        self.assertAlmostEqual(ospa_distance([1.0, 9.0], [10.0, 0.0], cutoff=10), 1.0)
+        # One matched pair at distance 2, one missed target
+        self.assertAlmostEqual(ospa_distance([2.0], [0.0, 50.0], cutoff=10), 6.0)
+
+    def test_matches_brute_force_order_two(self):
+        rng = np.random.default_rng(0)
+        x, y = rng.uniform(0, 20, (4, 2)), rng.uniform(0, 20, (6, 2))
+        cost = np.minimum(np.linalg.norm(x[:, None] - y[None], axis=-1), 5.0) ** 2
+        rows, cols = linear_sum_assignment(cost)
+        expected = np.sqrt((cost[rows, cols].sum() + 25.0 * 2) / 6)
+        self.assertAlmostEqual(ospa_distance(x, y, cutoff=5.0, order=2), expected)
+        self.assertAlmostEqual(ospa_distance(y, x, cutoff=5.0, order=2), expected)
+
+class TestBenchmark(unittest.TestCase):
+    def test_scenarios(self):
+        counts = {name: np.isfinite(scenario(30)).sum(axis=1)
+                  for name, scenario in SCENARIOS.items()}
+        np.testing.assert_array_equal(counts['crossing'], 2)
+        self.assertEqual((counts['birth'][0], counts['birth'][-1]), (1, 3))
+        self.assertEqual((counts['death'][0], counts['death'][-1]), (3, 1))
+
+    def test_run_scenario_reproducible(self):
+        trajectories = SCENARIOS['crossing'](20)
+        first = run_scenario(trajectories, n_runs=2, seed=3, num_particles=300)
+        second = run_scenario(trajectories, n_runs=2, seed=3, num_particles=300)
+        np.testing.assert_array_equal(first[0], second[0])
+        self.assertEqual(first[2].shape, (2, 20))
+        self.assertTrue(np.all((first[0] >= 0) & (first[0] <= 10)))
+
+    def test_benchmark_report(self):
+        results = benchmark([{'num_particles': 200}, {'num_particles': 400, 'gate': 5}],
+                            n_steps=15, n_runs=1)
+        self.assertEqual(len(results), 2 * len(SCENARIOS))
+        for result in results:
+            self.assertEqual(sorted(result.latency), [50, 90, 99])
+            self.assertGreater(result.scans_per_second, 0)
+        frontier = pareto_frontier([r for r in results if r.scenario == 'crossing'])
+        self.assertGreaterEqual(len(frontier), 1)
+        self.assertTrue(all(a.ospa > b.ospa for a, b in zip(frontier, frontier[1:])))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pywt
+from signal_processing.design import DesignCache
+from signal_processing.utils import (WAVELET_CACHE_BYTES, _wavelet_cache, band_scalogram,
+                                     clear_wavelet_cache, compute_wavelet_transform,
+                                     iter_scalogram, wavelet_cache_info, wavelet_scalogram)
+
+class TestComputeWaveletTransform(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.signal = np.sin(2 * np.pi * 10 * np.arange(1000) / 250) + rng.standard_normal(1000)
+        self.scales = np.arange(1, 64)
+
+    def test_matches_pywt(self):
+        for wavelet in ('cmor1.5-1.0', 'morl', 'mexh'):
+            expected, freqs = pywt.cwt(self.signal, self.scales, wavelet, sampling_period=1 / 250)
+            coefficients, frequencies = compute_wavelet_transform(self.signal, self.scales,
+                                                                  wavelet, 1 / 250)
+            self.assertEqual(coefficients.dtype, expected.dtype)
+            np.testing.assert_allclose(coefficients, expected, atol=1e-10 * np.abs(expected).max())
+            np.testing.assert_allclose(frequencies, freqs)
+
+    def test_multichannel_axis(self):
+        data = np.stack([self.signal, self.signal[::-1]], axis=1)
+        coefficients, _ = compute_wavelet_transform(data, self.scales, 'morl', axis=0)
+        self.assertEqual(coefficients.shape, (len(self.scales),) + data.shape)
+        expected, _ = pywt.cwt(self.signal[::-1], self.scales, 'morl')
+        np.testing.assert_allclose(coefficients[:, :, 1], expected, atol=1e-9)
+
+    def test_single_precision(self):
+        coefficients, _ = compute_wavelet_transform(self.signal, self.scales, 'cmor1.5-1.0',
+                                                    dtype=np.float32)
+        self.assertEqual(coefficients.dtype, np.complex64)
+        expected, _ = pywt.cwt(self.signal, self.scales, 'cmor1.5-1.0')
+        np.testing.assert_allclose(coefficients, expected, atol=1e-5 * np.abs(expected).max())
+
+    def test_responses_are_cached(self):
+        clear_wavelet_cache()
+        compute_wavelet_transform(self.signal, self.scales, 'morl')
+        misses = wavelet_cache_info().misses
+        compute_wavelet_transform(self.signal, self.scales, 'morl')
+        self.assertEqual(wavelet_cache_info().misses, misses)
+        self.assertLessEqual(_wavelet_cache.nbytes, WAVELET_CACHE_BYTES)
+
+    def test_cache_is_bounded_in_bytes(self):
+        cache = DesignCache(10, maxbytes=3000)
+        for i in range(5):
+            cache.get(i, lambda: np.zeros(100))
+        self.assertEqual((cache.info().currsize, cache.nbytes), (3, 2400))
+        cache.get('large', lambda: np.zeros(1000))
+        self.assertEqual(cache.info().currsize, 3)
+
+    def test_conv_method_and_errors(self):
+        expected, _ = pywt.cwt(self.signal, self.scales, 'mexh')
+        np.testing.assert_array_equal(compute_wavelet_transform(self.signal, self.scales, 'mexh',
+                                                                method='conv')[0], expected)
+        with self.assertRaises(ValueError):
+            compute_wavelet_transform(self.signal, [0.0], 'mexh')
+        with self.assertRaises(ValueError):
+            compute_wavelet_transform(self.signal, self.scales, 'mexh', method='bogus')
+
+class TestChunkedScalogram(unittest.TestCase):
+    def setUp(self):
+        self.data = np.random.default_rng(1).standard_normal((2, 5000))
+        self.scales = np.arange(1, 80)
+
+    def test_seam_free(self):
+        full, freqs = compute_wavelet_transform(self.data, self.scales, 'cmor1.5-1.0')
+        scalogram, frequencies = wavelet_scalogram(self.data, self.scales, 'cmor1.5-1.0',
+                                                   block_size=700, dtype=np.float64)
+        np.testing.assert_allclose(scalogram, np.abs(full), atol=1e-10 * np.abs(full).max())
+        np.testing.assert_allclose(frequencies, freqs)
+
+    def test_power_decimated_time_axis_first(self):
+        full, _ = compute_wavelet_transform(self.data.T, self.scales, 'morl', axis=0)
+        scalogram, _ = wavelet_scalogram(self.data.T, self.scales, 'morl', output='power',
+                                         decimate=3, block_size=1000, axis=0, dtype=np.float64)
+        self.assertEqual(scalogram.shape, (len(self.scales), 1667, 2))
+        np.testing.assert_allclose(scalogram, full[:, ::3] ** 2, atol=1e-10 * (full ** 2).max())
+
+    def test_blocks_and_memmap(self):
+        starts = [start for start, _ in iter_scalogram(self.data, self.scales, 'mexh',
+                                                       decimate=2, block_size=999)]
+        self.assertEqual(starts, [0, 500, 1000, 1500, 2000])
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'scalogram.npy')
+            written, _ = wavelet_scalogram(self.data, self.scales, 'mexh', path=path,
+                                           block_size=999)
+            del written
+            stored = np.load(path, mmap_mode='r')
+            self.assertEqual(stored.dtype, np.float32)
+            expected = np.abs(compute_wavelet_transform(self.data, self.scales, 'mexh')[0])
+            np.testing.assert_allclose(stored, expected, atol=1e-5 * expected.max())
+            del stored
+
+    def test_unknown_output(self):
+        with self.assertRaises(ValueError):
+            wavelet_scalogram(self.data, self.scales, 'mexh', output='phase')
+
+class TestBandScalogram(unittest.TestCase):
+    def setUp(self):
+        self.fs = 250
+        self.data = np.random.default_rng(2).standard_normal((3, 4000))
+
+    def test_log_spaced_scales(self):
+        result = band_scalogram(self.data, self.fs, fmin=1.0, fmax=64.0, voices_per_octave=4)
+        self.assertEqual(len(result), 25)
+        np.testing.assert_allclose(result.frequencies[[0, 4, -1]], [64.0, 32.0, 1.0])
+        decimated = result.factors > 1
+        rates = self.fs / result.factors[decimated]
+        self.assertTrue(np.all(rates >= 4.0 * result.frequencies[decimated]))
+        self.assertTrue(np.all(np.diff(result.factors) >= 0))
+
+    def test_decimated_samples_match_full_transform(self):
+        result = band_scalogram(self.data, self.fs, fmin=2.0, fmax=40.0, dtype=np.float64,
+                                output='complex')
+        full, _ = compute_wavelet_transform(self.data, result.scales, 'cmor1.5-1.0')
+        for i, (values, q) in enumerate(zip(result.values, result.factors)):
+            self.assertEqual(values.shape, (3, -(-4000 // q)))
+            np.testing.assert_allclose(values, full[i][:, ::q], atol=1e-10 * np.abs(full).max())
+        self.assertEqual(result.dense().shape, (len(result), 3, 4000))
+        np.testing.assert_allclose(result.times(len(result) - 1)[1], result.factors[-1] / self.fs)
+
+    def test_time_axis_first(self):
+        result = band_scalogram(self.data.T, self.fs, axis=0)
+        self.assertEqual(result.values[-1].shape, (-(-4000 // result.factors[-1]), 3))
+        self.assertEqual(result.values[0].dtype, np.float32)
+        self.assertEqual(result.dense().shape, (len(result), 4000, 3))
+
+    def test_responses_are_not_cached(self):
+        clear_wavelet_cache()
+        band_scalogram(self.data, self.fs)
+        self.assertEqual(wavelet_cache_info().currsize, 1)
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            band_scalogram(self.data, self.fs, fmin=1.0, fmax=200.0)
+
+if __name__ == "__main__":
+    unittest.main()